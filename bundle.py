@@ -0,0 +1,61 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from links import find_pages, get_page_name, get_service_of
+
+bundles_folder_name = 'bundles'
+bundle_manifest_name = 'manifest.json'
+
+
+def get_bundle_name(service):
+    return 'site' if service == '(site)' else service
+
+
+def get_pages_per_service(docs_path):
+    pages_per_service = {}
+    for path in sorted(find_pages(docs_path)):
+        page = get_page_name(path, docs_path)
+        pages_per_service.setdefault(get_service_of(page), []).append((f'{page}.md', path))
+    return pages_per_service
+
+
+def write_bundle(bundle_path, pages):
+    contents = {}
+    for name, path in pages:
+        with open(path) as f:
+            contents[name] = f.read()
+    # sorted keys and mtime=0 so that unchanged pages give an unchanged bundle, and so an unchanged hash
+    data = gzip.compress(json.dumps(contents, separators=(',', ':'), sort_keys=True).encode(), 9, mtime=0)
+    with open(bundle_path, 'wb') as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()[:16], len(data)
+
+
+def write_bundles(docs_path='docs'):
+    bundles_path = f'{docs_path}/{bundles_folder_name}'
+    shutil.rmtree(bundles_path, ignore_errors=True)
+    os.makedirs(bundles_path)
+    bundles = {}
+    for service, pages in sorted(get_pages_per_service(docs_path).items()):
+        file_name = f'{get_bundle_name(service)}.json.gz'
+        bundle_hash, size = write_bundle(f'{bundles_path}/{file_name}', pages)
+        bundles[get_bundle_name(service)] = {
+            'url': f'{bundles_folder_name}/{file_name}',
+            'hash': bundle_hash,
+            'pages': len(pages),
+            'size': size,
+        }
+    # docs/sw.js reads this to decide which of the pinned bundles changed and need to be downloaded again
+    with open(f'{bundles_path}/{bundle_manifest_name}', 'w') as f:
+        json.dump({'bundles': bundles}, f, separators=(',', ':'), sort_keys=True)
+    return bundles
+
+
+if __name__ == "__main__":
+    written_bundles = write_bundles(*sys.argv[1:2])
+    total_size = sum(bundle['size'] for bundle in written_bundles.values())
+    print(f'wrote {len(written_bundles)} bundles, {total_size} bytes in total')
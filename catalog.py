@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import sys
+
+import pythonic
+
+catalog_index_name = 'index.json'
+
+
+def clear_catalog(catalog_path):
+    shutil.rmtree(catalog_path, ignore_errors=True)
+
+
+def get_shape_record(shape):
+    record = {'kind': 'shape', 'name': shape.name, 'type': shape.type_name}
+    if hasattr(shape, 'members'):
+        record['members'] = {name: member.name for name, member in shape.members.items()}
+        record['required'] = shape.required_members
+    elif hasattr(shape, 'member'):
+        record['member'] = shape.member.name
+    elif shape.type_name == 'map':
+        record['key'], record['value'] = shape.key.name, shape.value.name
+    if getattr(shape, 'enum', None):
+        record['enum'] = shape.enum
+    return record
+
+
+def get_operation_record(operation_model, service_path):
+    input_shape, output_shape = operation_model.input_shape, operation_model.output_shape
+    method = pythonic.xform_name(operation_model.name)
+    return {
+        'kind': 'operation',
+        'name': operation_model.name,
+        'method': method,
+        'input': input_shape.name if input_shape else None,
+        'output': output_shape.name if output_shape else None,
+        'required': input_shape.required_members if input_shape else [],
+        'path': f'{service_path}/client/operations/{method}',
+    }
+
+
+def get_resource_record(node):
+    resource_model = node['model']
+    return {
+        'kind': 'resource',
+        'name': resource_model.name,
+        'path': node['path'],
+        'parent': node['parent'],
+        'shape': resource_model.shape,
+        'identifiers': [identifier.name for identifier in resource_model.identifiers],
+        'actions': {action.name: action.request.operation for action in resource_model.actions if action.request},
+        'collections': {
+            collection.name: {'operation': collection.request.operation, 'resource': collection.resource.model.name}
+            for collection in resource_model.collections
+        },
+        'sub_resources': [sub_resource.resource.model.name for sub_resource in resource_model.subresources],
+        'waiters': {waiter.name: waiter.waiter_name for waiter in resource_model.waiters},
+    }
+
+
+def get_service_records(service):
+    service_model, service_path = service['service_model'], service['service_path']
+    operation_records = [
+        get_operation_record(service_model.operation_model(name), service_path)
+        for name in sorted(service_model.operation_names)
+    ]
+    shape_records = [get_shape_record(service_model.shape_for(name)) for name in sorted(service_model.shape_names)]
+    paginator_records = [
+        {'kind': 'paginator', 'name': name, **config} for name, config in sorted(service['paginator_config'].items())
+    ]
+    waiter_records = []
+    for name, waiter in service['waiters'].items():
+        waiter_records.append(
+            {
+                'kind': 'waiter',
+                'name': name,
+                'operation': waiter.operation,
+                'delay': waiter.delay,
+                'max_attempts': waiter.max_attempts,
+            }
+        )
+    resource_records = [get_resource_record(node) for node in service['resource_graph'].values()]
+    header = {
+        'kind': 'service',
+        'name': service['client_name'],
+        'service_name': service['service_name'],
+        'service_id': service_model.service_id,
+        'class_name': service['class_name'],
+        'api_version': service_model.api_version,
+        'endpoint_prefix': service_model.endpoint_prefix,
+        'path': service_path,
+        'operations': len(operation_records),
+        'shapes': len(shape_records),
+        'paginators': len(paginator_records),
+        'waiters': len(waiter_records),
+        'resources': len(resource_records),
+    }
+    return [header] + operation_records + shape_records + paginator_records + waiter_records + resource_records
+
+
+def write_service_catalog(service, catalog_path):
+    # newline-delimited: the first line is the service header, which is all the index needs to read
+    os.makedirs(catalog_path, exist_ok=True)
+    with open(f'{catalog_path}/{service["client_name"]}.ndjson', 'w') as f:
+        for record in get_service_records(service):
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def write_catalog_index(catalog_path, client_names=None):
+    # only the services of this build: a resumed build may find files of services that are not part of it anymore
+    if client_names is None:
+        file_names = sorted(x for x in os.listdir(catalog_path) if x.endswith('.ndjson'))
+    else:
+        file_names = [f'{client_name}.ndjson' for client_name in sorted(client_names)]
+    services = []
+    for file_name in file_names:
+        if not os.path.exists(f'{catalog_path}/{file_name}'):
+            print(f'{file_name} is missing from the catalog, leaving it out of the index', file=sys.stderr)
+            continue
+        with open(f'{catalog_path}/{file_name}') as f:
+            header = json.loads(f.readline())
+        header['file'] = file_name
+        services.append(header)
+    with open(f'{catalog_path}/{catalog_index_name}', 'w') as f:
+        json.dump({'services': services}, f, separators=(',', ':'))
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import sqlite3
+
+from catalog import get_service_records
+
+schema = """
+CREATE TABLE IF NOT EXISTS services (
+    name TEXT PRIMARY KEY, service_name TEXT, service_id TEXT, class_name TEXT, api_version TEXT,
+    endpoint_prefix TEXT, path TEXT
+);
+CREATE TABLE IF NOT EXISTS operations (
+    service TEXT, name TEXT, method TEXT, input_shape TEXT, output_shape TEXT, path TEXT
+);
+CREATE TABLE IF NOT EXISTS shapes (service TEXT, name TEXT, type TEXT);
+CREATE TABLE IF NOT EXISTS members (service TEXT, shape TEXT, name TEXT, member_shape TEXT, required INTEGER);
+CREATE TABLE IF NOT EXISTS enums (service TEXT, shape TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS paginators (
+    service TEXT, name TEXT, input_token TEXT, output_token TEXT, limit_key TEXT, result_key TEXT,
+    more_results TEXT
+);
+CREATE TABLE IF NOT EXISTS waiters (service TEXT, name TEXT, operation TEXT, delay INTEGER, max_attempts INTEGER);
+CREATE TABLE IF NOT EXISTS resource_actions (service TEXT, resource TEXT, name TEXT, operation TEXT);
+CREATE TABLE IF NOT EXISTS resource_collections (
+    service TEXT, resource TEXT, name TEXT, operation TEXT, item_resource TEXT
+);
+CREATE INDEX IF NOT EXISTS operations_by_name ON operations (name);
+CREATE INDEX IF NOT EXISTS operations_by_service ON operations (service, name);
+CREATE INDEX IF NOT EXISTS operations_by_input ON operations (service, input_shape);
+CREATE INDEX IF NOT EXISTS shapes_by_service ON shapes (service, name);
+CREATE INDEX IF NOT EXISTS members_by_shape ON members (service, shape);
+CREATE INDEX IF NOT EXISTS members_by_name ON members (name);
+CREATE INDEX IF NOT EXISTS enums_by_value ON enums (value);
+CREATE INDEX IF NOT EXISTS paginators_by_service ON paginators (service, name);
+CREATE INDEX IF NOT EXISTS waiters_by_operation ON waiters (operation);
+CREATE INDEX IF NOT EXISTS resource_actions_by_operation ON resource_actions (operation);
+CREATE INDEX IF NOT EXISTS resource_collections_by_operation ON resource_collections (operation);
+"""
+service_tables = [
+    'operations',
+    'shapes',
+    'members',
+    'enums',
+    'paginators',
+    'waiters',
+    'resource_actions',
+    'resource_collections',
+]
+queries = {
+    'operations-taking': """SELECT o.service, o.method, m.member_shape FROM operations o
+        JOIN members m ON m.service = o.service AND m.shape = o.input_shape
+        WHERE m.name = ? ORDER BY o.service, o.method""",
+    'waiters-polling': """SELECT service, name, operation, delay, max_attempts FROM waiters
+        WHERE operation LIKE ? ORDER BY service, name""",
+    'enum-value': 'SELECT service, shape FROM enums WHERE value = ? ORDER BY service, shape',
+}
+
+
+def clear_catalog_db(db_path):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def get_paginator_value(config, key):
+    value = config.get(key)
+    # a few paginators aggregate several result keys
+    return json.dumps(value) if isinstance(value, list) else value
+
+
+def get_rows(service_name, records):
+    rows = {table: [] for table in service_tables}
+    for record in records:
+        kind, name = record['kind'], record['name']
+        if kind == 'operation':
+            row = (service_name, name, record['method'], record['input'], record['output'], record['path'])
+            rows['operations'].append(row)
+        elif kind == 'shape':
+            rows['shapes'].append((service_name, name, record['type']))
+            required = record.get('required', [])
+            for member_name, member_shape in record.get('members', {}).items():
+                rows['members'].append((service_name, name, member_name, member_shape, member_name in required))
+            for value in record.get('enum', []):
+                rows['enums'].append((service_name, name, value))
+        elif kind == 'paginator':
+            keys = ['input_token', 'output_token', 'limit_key', 'result_key', 'more_results']
+            rows['paginators'].append((service_name, name, *[get_paginator_value(record, key) for key in keys]))
+        elif kind == 'waiter':
+            row = (service_name, name, record['operation'], record['delay'], record['max_attempts'])
+            rows['waiters'].append(row)
+        elif kind == 'resource':
+            for action_name, operation in record['actions'].items():
+                rows['resource_actions'].append((service_name, name, action_name, operation))
+            for collection_name, collection in record['collections'].items():
+                row = (service_name, name, collection_name, collection['operation'], collection['resource'])
+                rows['resource_collections'].append(row)
+    return rows
+
+
+def write_service_catalog_db(service, db_path):
+    records = get_service_records(service)
+    header = records[0]
+    service_name = header['name']
+    rows = get_rows(service_name, records[1:])
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(schema)
+        # a single transaction per service; rows left by an interrupted run of the same service are replaced
+        with connection:
+            connection.execute('DELETE FROM services WHERE name = ?', (service_name,))
+            for table in service_tables:
+                connection.execute(f'DELETE FROM {table} WHERE service = ?', (service_name,))
+            keys = ['name', 'service_name', 'service_id', 'class_name', 'api_version', 'endpoint_prefix', 'path']
+            connection.execute('INSERT INTO services VALUES (?, ?, ?, ?, ?, ?, ?)', [header[key] for key in keys])
+            for table, table_rows in rows.items():
+                if table_rows:
+                    placeholders = ', '.join('?' * len(table_rows[0]))
+                    connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', table_rows)
+    finally:
+        connection.close()
+
+
+def query(db_path, sql, parameters):
+    connection = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        return connection.execute(queries.get(sql, sql), parameters).fetchall()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Queries the catalog database written by main.py --sqlite')
+    parser.add_argument('db_path')
+    parser.add_argument('sql', help=f'an SQL query, or one of the predefined queries: {", ".join(queries)}')
+    parser.add_argument('parameters', nargs='*', help='values for the ? placeholders of the query')
+    args = parser.parse_args()
+    for row in query(args.db_path, args.sql, args.parameters):
+        print('\t'.join('' if value is None else str(value) for value in row))
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+
+checkpoints_path = '.checkpoints'
+phase_names = ['service', 'client', 'paginators', 'waiters', 'resources', 'data-types', 'enums', 'catalog', 'sqlite']
+
+
+def clear_checkpoints(client_names=None):
+    if client_names is None:
+        shutil.rmtree(checkpoints_path, ignore_errors=True)
+        return
+    for client_name in client_names:
+        if os.path.exists(get_checkpoint_path(client_name)):
+            os.remove(get_checkpoint_path(client_name))
+
+
+def get_checkpoint_path(client_name):
+    return f'{checkpoints_path}/{client_name}.json'
+
+
+def load_checkpoint(client_name):
+    try:
+        with open(get_checkpoint_path(client_name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'phases': {}, 'done': False}
+
+
+def save_checkpoint(client_name, checkpoint):
+    # write then rename so that a crash never leaves a half-written checkpoint behind
+    os.makedirs(checkpoints_path, exist_ok=True)
+    path = get_checkpoint_path(client_name)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def run_phase(client_name, checkpoint, phase, fn):
+    if phase in checkpoint['phases']:
+        return
+    sidebar_lines, services_lines = [], []
+    fn(sidebar_lines, services_lines)
+    checkpoint['phases'][phase] = {'sidebar': sidebar_lines, 'services': services_lines}
+    save_checkpoint(client_name, checkpoint)
+
+
+def mark_done(client_name, checkpoint):
+    checkpoint['done'] = True
+    save_checkpoint(client_name, checkpoint)
+
+
+def get_fragment_lines(checkpoint, key):
+    phases = checkpoint['phases']
+    return [line for phase in phase_names if phase in phases for line in phases[phase][key]]
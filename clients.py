@@ -1,13 +1,20 @@
-from typing import List, Union, Dict
+from __future__ import annotations
 
-from botocore.model import ServiceModel, OperationModel, StringShape, ListShape, Shape, StructureShape, MapShape
+import os
+from typing import TYPE_CHECKING, List, Union, Dict
 
 import pythonic
+from examples import get_example_value, get_example_imports
+from html_docs import html_to_markdown, quote_markdown
+from parallel import render_in_order
+from references import get_used_by_string
+from shared_shapes import get_shared_anchor, get_shared_shapes, shared_shapes_path
 from util import (
     create_new_file,
     get_botostubs_message,
     write_lines,
     get_service_name,
+    get_shape_href,
     get_shape_string_link,
     primitive_map,
     get_enum_message,
@@ -16,7 +23,11 @@ from util import (
     get_operation_documentation,
 )
 
-shape_union = Union[None, StringShape, ListShape, Shape, StructureShape, MapShape]
+# botocore is only imported for type checking: the generator modules load it lazily, through the session
+if TYPE_CHECKING:
+    from botocore.model import ServiceModel, OperationModel, StringShape, ListShape, Shape, StructureShape, MapShape
+
+    shape_union = Union[None, StringShape, ListShape, Shape, StructureShape, MapShape]
 sidebar_path = 'docs/_sidebar.md'
 services_path = 'docs/services.md'
 
@@ -46,7 +57,7 @@ client = session.client('{client_name}')  # type: botostubs.{class_name}
     ]
 
 
-def handle_client(client, client_name, class_name, service_path, sidebar_lines, shapes_path):
+def handle_client(client, client_name, class_name, service_path, sidebar_lines, shapes_path, references):
     print('handling client', client_name)
     service_model: ServiceModel = client._service_model
     service_name = get_service_name(service_model)
@@ -56,15 +67,16 @@ def handle_client(client, client_name, class_name, service_path, sidebar_lines,
     sidebar_lines.append(f'        - [{service_id} client]({client_path})')
     docs_client_path = f'docs/{client_path}.md'
     client_list_items = create_client_index(docs_client_path, client_name, service_name, class_name)
-    for name in service_model.operation_names:
-        handle_client_operation(
-            class_name, client_list_items, client_name, client_path, name, service_model, shapes_path
-        )
+    client_list_items += render_in_order(
+        lambda name: handle_client_operation(class_name, client_name, client_path, name, service_model, shapes_path),
+        sorted(service_model.operation_names),
+        service_model._shape_resolver,
+    )
     write_lines(docs_client_path, client_list_items)
-    handle_shapes(service_model, class_name, shapes_path)
+    handle_shapes(service_model, class_name, shapes_path, references)
 
 
-def handle_client_operation(class_name, client_list_items, client_name, client_path, name, service_model, shapes_path):
+def handle_client_operation(class_name, client_name, client_path, name, service_model, shapes_path):
     fn_name = pythonic.xform_name(name)
     method_path = f'{client_path}/operations/{fn_name}.md'
     list_item, signature, documentation, headline = get_method_page(
@@ -73,7 +85,7 @@ def handle_client_operation(class_name, client_list_items, client_name, client_p
     docs_method_path = f'docs/{method_path}'
     create_new_file(docs_method_path)
     write_lines(docs_method_path, [headline, documentation, signature])
-    client_list_items.append(list_item)
+    return list_item
 
 
 def get_example_client_snippet(client_name, service, fn_name, parameters, required_members, output_shape):
@@ -82,7 +94,7 @@ def get_example_client_snippet(client_name, service, fn_name, parameters, requir
     param_str = get_parameter_declaration_with(parameters, required_members)
     return f"""## Example snippet
 ```python
-import boto3
+{get_example_imports(param_str)}import boto3
 
 client = boto3.client('{client_name}')  # type: botostubs.{service}
 result = client.{fn_name}({param_str}){result_type_hint}
@@ -90,22 +102,22 @@ result = client.{fn_name}({param_str}){result_type_hint}
 {get_botostubs_message()}"""
 
 
-def get_shape_doc(shapes_path, shape: shape_union):
+def get_shape_doc(shapes_path, shape: shape_union, references=None):
     docstr = f'## {shape.name}\n'
-    docstr += f'> {shape.documentation}\n\n'
+    docstr += f'> {quote_markdown(html_to_markdown(shape.documentation))}\n\n'
     if hasattr(shape, 'members'):
         members = sorted(shape.members.items())
     elif hasattr(shape, 'member'):
         members = [(shape.member.name, shape.member)]
-    elif isinstance(shape, MapShape):
+    elif shape.type_name == 'map':
         members = [('Key', shape.key), ('Value', shape.value)]
     else:
         members = []
     word = 'containing:\n\n' if len(members) > 1 else 'of: '
     docstr += f'A {get_familiar_type_name(shape)} {word}'
     for param_key, param_value in members:
-        documentation = param_value.documentation
-        doc = f': \n\n > {documentation}\n\n' if documentation else '\n'
+        documentation = html_to_markdown(param_value.documentation)
+        doc = f': \n\n > {quote_markdown(documentation)}\n\n' if documentation else '\n'
 
         required_str = 'required ' if param_key in shape.required_members else ''
         name = param_key
@@ -115,9 +127,10 @@ def get_shape_doc(shapes_path, shape: shape_union):
         elif param_value.name.lower() in primitive_map:
             docstr += f"""<b>{name}</b>"""
         else:
-            docstr += f"""<b>[{name}]({shapes_path}#{name})</b>"""
+            docstr += f"""<b>[{name}]({get_shape_href(name, shapes_path)})</b>"""
         docstr += doc + '\n'
-        docstr += get_enum_message(param_value)
+        docstr += get_enum_message(param_value, shapes_path)
+    docstr += get_used_by_string(shape.name, references)
     return docstr
 
 
@@ -155,18 +168,69 @@ def get_method_page(client_name, class_name, service_model, operation_name, meth
     return list_item, signature, documentation, headline
 
 
-def handle_shapes(service_model: ServiceModel, class_name, shapes_path):
-    top_level_shapes = [(service_model.shape_for(name), class_name) for name in service_model.shape_names]
+def get_operation_output_shapes(service_model: ServiceModel):
+    return {name: service_model.operation_model(name).output_shape for name in service_model.operation_names}
+
+
+def handle_shapes(service_model: ServiceModel, class_name, shapes_path, references):
+    top_level_shapes = [(service_model.shape_for(name), class_name) for name in sorted(service_model.shape_names)]
     if not top_level_shapes:
         return
     docs_shapes_path = f'docs/{shapes_path}'
     create_new_file(docs_shapes_path)
     service_name = get_service_name(service_model)
     all_shapes = find_all_shapes(top_level_shapes)
-    shape_docs = [get_shape_doc(shapes_path, shape) for shape in all_shapes]
+    shape_docs = render_in_order(
+        lambda shape: get_service_shape_doc(shapes_path, shape, references), all_shapes, service_model._shape_resolver
+    )
     write_lines(docs_shapes_path, [f'# {service_name} data types'] + shape_docs)
 
 
+def get_service_shape_doc(shapes_path, shape: shape_union, references):
+    if not get_shared_anchor(shapes_path, shape.name):
+        return get_shape_doc(shapes_path, shape, references)
+    # keeps the anchor, and what uses the shape in this service, for the links into this page
+    href = get_shape_href(shape.name, shapes_path)
+    docstr = f'## {shape.name}\n'
+    docstr += f'Documented with the [shared data types]({href}), as other services define it the same way.\n\n'
+    return docstr + get_used_by_string(shape.name, references)
+
+
+def get_shared_shape_doc(anchor, shape: shape_union, services):
+    shapes_path = services[0][1]
+    docstr = get_shape_doc(shapes_path, shape)
+    if anchor != shape.name:
+        docstr = docstr.replace(f'## {shape.name}\n', f'## {shape.name} :id={anchor}\n', 1)
+    defined_by = ', '.join(f'[{client_name}]({path}#{shape.name})' for client_name, path in services)
+    return docstr + f'_Defined by: {defined_by}_\n\n'
+
+
+def handle_shared_shapes():
+    import botocore.session
+
+    docs_shared_path = f'docs/{shared_shapes_path}'
+    shared_shapes = get_shared_shapes()
+    if not shared_shapes:
+        if os.path.exists(docs_shared_path):
+            os.remove(docs_shared_path)
+        return 0
+    print('handling', len(shared_shapes), 'shared data types')
+    session = botocore.session.get_session()
+    anchors_per_service = {}
+    for anchor, (_, services) in shared_shapes.items():
+        anchors_per_service.setdefault(services[0][0], []).append(anchor)
+    shape_docs = {}
+    # one model at a time: each shape is rendered from the first service that defines it
+    for client_name, anchors in sorted(anchors_per_service.items()):
+        service_model = session.get_service_model(client_name)
+        for anchor in anchors:
+            shape_name, services = shared_shapes[anchor]
+            shape_docs[anchor] = get_shared_shape_doc(anchor, service_model.shape_for(shape_name), services)
+    create_new_file(docs_shared_path)
+    write_lines(docs_shared_path, ['# Shared data types'] + [shape_docs[anchor] for anchor in sorted(shape_docs)])
+    return len(shape_docs)
+
+
 def get_parameter_declaration_with(params: Dict[str, shape_union], required_members: List[str]):
     return ', '.join(map(lambda x: param_to_string(x, params[x]), filter(lambda x: x in required_members, params)))
 
@@ -186,12 +250,13 @@ def get_type_of_x_message(shapes_path, param_value, required_str):
         return param_value.type_name
     # if param_value.name in primitive_map:
     #   return primitive_map[param_value.name]
-    return f'{required_str}[{param_value.name}]({shapes_path}#{param_value.name}) {get_familiar_type_name(param_value)}'
+    href = get_shape_href(param_value.name, shapes_path)
+    return f'{required_str}[{param_value.name}]({href}) {get_familiar_type_name(param_value)}'
 
 
 def get_param_name_with_type_hint(shape, name, param, shapes_path):
     if param.type_name == 'list':
-        type_hint = f'[{param.name}]({shapes_path}#{param.name})'
+        type_hint = f'[{param.name}]({get_shape_href(param.name, shapes_path)})'
     else:
         type_hint = primitive_map.get(param.type_name, param.type_name)
     if name not in shape.required_members:
@@ -234,34 +299,7 @@ def find_all_shapes(shapes):
 
 
 def param_to_string(name, shape):
-    def member_to_string(key):
-        result = f"'{key}': "
-        member_shape = shape.members[key]
-        if member_shape.type_name == 'string':
-            result += "'...'"
-        elif member_shape.type_name == 'boolean':
-            result += "True"
-        elif member_shape.type_name in ['integer', 'float']:
-            result += '0'
-        return result
-
-    result = name
-    if shape.type_name == 'list':
-        if isinstance(shape.member, StringShape):
-            result += "=['...']"
-        else:
-            result += '=[{}]'
-    elif shape.type_name == 'string':
-        result += "='...'"
-    elif shape.type_name == 'boolean':
-        result += "=True"
-    elif shape.type_name == 'structure':
-        result += '={'
-
-        if shape.required_members:
-            result += ', '.join(map(member_to_string, shape.required_members))
-        result += '}'
-    return result
+    return f'{name}={get_example_value(shape)}'
 
 
 def _find_all_shapes(shapes, parent_shapes):
@@ -277,7 +315,7 @@ def _find_all_shapes(shapes, parent_shapes):
             members = [shape.member]
         elif hasattr(shape, 'members'):
             members = list(shape.members.values())
-        elif isinstance(shape, MapShape):
+        elif shape.type_name == 'map':
             members = [shape.key, shape.value]
         else:
             assert False
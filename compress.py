@@ -0,0 +1,85 @@
+import gzip
+import os
+import sys
+
+from links import get_service_of
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+compressible_extensions = ('.md', '.html', '.json', '.js', '.css', '.svg', '.txt')
+
+
+def find_compressible_files(docs_path):
+    for directory, _, file_names in os.walk(docs_path):
+        for file_name in file_names:
+            if file_name.endswith(compressible_extensions):
+                yield os.path.join(directory, file_name)
+
+
+def is_up_to_date(path, sidecar_path):
+    try:
+        return os.stat(sidecar_path).st_mtime >= os.stat(path).st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def write_sidecar(path, sidecar_path, compress, data):
+    if not is_up_to_date(path, sidecar_path):
+        with open(sidecar_path, 'wb') as f:
+            f.write(compress(data))
+    return os.stat(sidecar_path).st_size
+
+
+def compress_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps the gzip header, and so the sidecar, identical across builds
+    gzip_size = write_sidecar(path, f'{path}.gz', lambda x: gzip.compress(x, compresslevel=9, mtime=0), data)
+    brotli_size = write_sidecar(path, f'{path}.br', lambda x: brotli.compress(x, quality=11), data) if brotli else 0
+    return len(data), gzip_size, brotli_size
+
+
+def compress_tree(docs_path='docs', workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    paths = sorted(find_compressible_files(docs_path))
+    with ProcessPoolExecutor(workers) as executor:
+        sizes = list(executor.map(compress_file, paths, chunksize=64))
+    sizes_per_service = {}
+    for path, file_sizes in zip(paths, sizes):
+        service = get_service_of(os.path.relpath(path, docs_path).replace(os.sep, '/'))
+        totals = sizes_per_service.setdefault(service, [0, 0, 0, 0])
+        totals[0] += 1
+        for index, size in enumerate(file_sizes):
+            totals[index + 1] += size
+    return sizes_per_service
+
+
+def get_savings(original_size, compressed_size):
+    return f'{100 - 100 * compressed_size / original_size:.1f}%' if original_size else '-'
+
+
+def print_size_report(sizes_per_service):
+    print(f'{"service":<32}{"files":>8}{"bytes":>14}{"gzip":>14}{"saved":>8}{"brotli":>14}{"saved":>8}')
+    totals = [0, 0, 0, 0]
+    for service, (file_count, original_size, gzip_size, brotli_size) in sorted(sizes_per_service.items()):
+        totals = [total + size for total, size in zip(totals, [file_count, original_size, gzip_size, brotli_size])]
+        print_size_line(service, file_count, original_size, gzip_size, brotli_size)
+    print_size_line('total', *totals)
+    if not brotli:
+        print('install the brotli package to also write .br files')
+
+
+def print_size_line(service, file_count, original_size, gzip_size, brotli_size):
+    brotli_columns = f'{brotli_size:>14}{get_savings(original_size, brotli_size):>8}' if brotli else ''
+    print(
+        f'{service:<32}{file_count:>8}{original_size:>14}{gzip_size:>14}'
+        f'{get_savings(original_size, gzip_size):>8}{brotli_columns}'
+    )
+
+
+if __name__ == "__main__":
+    print_size_report(compress_tree(*sys.argv[1:2]))
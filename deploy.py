@@ -0,0 +1,162 @@
+import argparse
+import hashlib
+import json
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import get_file_hashes
+
+# kept in the bucket, next to the site, and only written once everything else is: a failed deploy is just retried
+remote_manifest_key = '.deploy-manifest.json'
+content_types = {
+    '.md': 'text/markdown; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json',
+    '.css': 'text/css; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.txt': 'text/plain; charset=utf-8',
+    # the offline bundles, which docs/sw.js decompresses itself
+    '.gz': 'application/gzip',
+}
+# the most paths a single invalidation should list before they are collapsed into wildcards
+max_invalidation_paths = 100
+delete_batch_size = 1000
+
+
+def get_s3_client(endpoint_url, workers):
+    import boto3
+    from botocore.config import Config
+
+    # one client shared by all the upload threads, with a connection for each of them
+    return boto3.client('s3', endpoint_url=endpoint_url, config=Config(max_pool_connections=workers))
+
+
+def get_content_type(key):
+    extension = key[key.rfind('.') :] if '.' in key else ''
+    return content_types.get(extension) or mimetypes.guess_type(key)[0] or 'application/octet-stream'
+
+
+def is_sidecar(key, keys):
+    # the .gz/.br files written by compress.py: the .gz one is uploaded in place of its page, the .br one is not used
+    return key.endswith(('.gz', '.br')) and key[:-3] in keys
+
+
+def get_local_files(docs_path):
+    file_hashes = get_file_hashes(docs_path)
+    local_files = {}
+    for key, file_hash in file_hashes.items():
+        if not is_sidecar(key, file_hashes):
+            # so that a page is uploaded again when it starts or stops being served compressed
+            local_files[key] = f'{file_hash}+gzip' if f'{key}.gz' in file_hashes else file_hash
+    return local_files, file_hashes
+
+
+def load_remote_manifest(s3, bucket):
+    try:
+        response = s3.get_object(Bucket=bucket, Key=remote_manifest_key)
+    except s3.exceptions.NoSuchKey:
+        # never deployed with this script: every object gets uploaded, and those that are not in the build deleted
+        keys = {}
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket):
+            keys.update({item['Key']: None for item in page.get('Contents', []) if item['Key'] != remote_manifest_key})
+        return keys
+    return json.loads(response['Body'].read())
+
+
+def get_deploy_plan(local_files, remote_files):
+    changed = sorted(key for key, file_hash in local_files.items() if remote_files.get(key) != file_hash)
+    stale = sorted(key for key in remote_files if key not in local_files)
+    return changed, stale
+
+
+def upload_file(s3, bucket, docs_path, key, all_files, acl):
+    extra_args = {'ContentType': get_content_type(key)}
+    if acl:
+        extra_args['ACL'] = acl
+    path = f'{docs_path}/{key}'
+    if f'{key}.gz' in all_files:
+        path = f'{path}.gz'
+        extra_args['ContentEncoding'] = 'gzip'
+    s3.upload_file(path, bucket, key, ExtraArgs=extra_args)
+    return key
+
+
+def delete_keys(s3, bucket, keys):
+    for start in range(0, len(keys), delete_batch_size):
+        batch = [{'Key': key} for key in keys[start : start + delete_batch_size]]
+        response = s3.delete_objects(Bucket=bucket, Delete={'Objects': batch, 'Quiet': True})
+        if response.get('Errors'):
+            raise RuntimeError(f'could not delete {len(response["Errors"])} objects: {response["Errors"][:3]}')
+
+
+def collapse_path(path, depth):
+    parts = path.split('/')
+    return '/'.join(parts[: depth + 1]) + '/*' if len(parts) - 1 > depth else path
+
+
+def get_invalidation_paths(keys, max_paths=max_invalidation_paths):
+    paths = {f'/{key}' for key in keys}
+    if 'index.html' in keys:
+        paths.add('/')
+    depth = max((path.count('/') for path in paths), default=0)
+    # wildcards from the deepest folders up, until few enough paths are left
+    while len(paths) > max_paths and depth > 0:
+        depth -= 1
+        paths = {collapse_path(path, depth) for path in paths}
+    return sorted(paths)
+
+
+def get_caller_reference(remote_files, paths):
+    # the same deploy retried gives the same reference, and so is not invalidated twice; deploying a tree that was
+    # deployed before, like after a rollback, starts from another remote manifest and so gets a new reference
+    state = json.dumps([remote_files, paths], separators=(',', ':'), sort_keys=True).encode()
+    return hashlib.sha256(state).hexdigest()
+
+
+def invalidate(distribution_id, paths, caller_reference):
+    import boto3
+
+    cloudfront = boto3.client('cloudfront')
+    batch = {'Paths': {'Quantity': len(paths), 'Items': paths}, 'CallerReference': caller_reference}
+    return cloudfront.create_invalidation(DistributionId=distribution_id, InvalidationBatch=batch)
+
+
+def deploy(
+    bucket, docs_path='docs', endpoint_url=None, distribution_id=None, acl='public-read', workers=32, dry_run=False
+):
+    s3 = get_s3_client(endpoint_url, workers)
+    local_files, all_files = get_local_files(docs_path)
+    remote_files = load_remote_manifest(s3, bucket)
+    changed, stale = get_deploy_plan(local_files, remote_files)
+    # new keys were never served, so only replaced and deleted ones can be cached by the distribution
+    paths = get_invalidation_paths([key for key in changed if key in remote_files] + stale)
+    print(f'{len(changed)} objects to upload, {len(stale)} to delete, {len(local_files) - len(changed)} unchanged')
+    if dry_run:
+        print('\n'.join(f'invalidate {path}' for path in paths))
+        return changed, stale, paths
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(upload_file, s3, bucket, docs_path, key, all_files, acl) for key in changed]
+        for future in futures:
+            future.result()
+    delete_keys(s3, bucket, stale)
+    if distribution_id and paths:
+        # before the manifest: when the invalidation fails, the retried deploy finds the same changes to invalidate
+        invalidate(distribution_id, paths, get_caller_reference(remote_files, paths))
+        print(f'invalidated {len(paths)} paths')
+    manifest_body = json.dumps(local_files, separators=(',', ':'), sort_keys=True).encode()
+    s3.put_object(Bucket=bucket, Key=remote_manifest_key, Body=manifest_body, ContentType='application/json')
+    return changed, stale, paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Uploads what changed in the docs folder since the last deploy')
+    parser.add_argument('bucket')
+    parser.add_argument('--docs-path', default='docs')
+    parser.add_argument('--endpoint-url', help='another S3 endpoint, like a local moto server')
+    parser.add_argument('--distribution-id', help='CloudFront distribution to invalidate the changed paths of')
+    parser.add_argument('--acl', default='public-read', help='canned ACL of the uploaded objects, empty for none')
+    parser.add_argument('--workers', type=int, default=32, help='concurrent uploads')
+    parser.add_argument('--dry-run', action='store_true', help='only print what would be uploaded and invalidated')
+    args = parser.parse_args()
+    deploy(args.bucket, args.docs_path, args.endpoint_url, args.distribution_id, args.acl, args.workers, args.dry_run)
@@ -0,0 +1,122 @@
+// Keeps the pages of the services a user pinned available offline. The pages come from the per-service bundles written
+// by bundle.py; bundles/manifest.json holds their hashes, so an update only downloads the bundles that changed.
+var pagesCacheName = 'botodocs-pages';
+var assetsCacheName = 'botodocs-assets';
+var pinnedKey = 'pinned.json';
+var manifestUrl = 'bundles/manifest.json';
+
+function getUrl(path) {
+  return new URL(path, self.registration.scope).href;
+}
+
+function readPinned(cache) {
+  return cache.match(getUrl(pinnedKey)).then(function(response) {
+    return response ? response.json() : {};
+  });
+}
+
+function writePinned(cache, pinned) {
+  return cache.put(getUrl(pinnedKey), new Response(JSON.stringify(pinned), {
+    headers: {'Content-Type': 'application/json'}
+  }));
+}
+
+function fetchManifest() {
+  return fetch(getUrl(manifestUrl), {cache: 'no-cache'}).then(function(response) {
+    return response.json();
+  });
+}
+
+function fetchBundle(bundle) {
+  return fetch(getUrl(bundle.url + '?' + bundle.hash)).then(function(response) {
+    var pages = response.body.pipeThrough(new DecompressionStream('gzip'));
+    return new Response(pages).json();
+  });
+}
+
+function cacheBundle(cache, pinned, name, bundle) {
+  return fetchBundle(bundle).then(function(pages) {
+    return Promise.all(Object.keys(pages).map(function(path) {
+      return cache.put(getUrl(path), new Response(pages[path], {
+        headers: {'Content-Type': 'text/markdown; charset=utf-8'}
+      }));
+    }));
+  }).then(function() {
+    pinned[name] = bundle.hash;
+  });
+}
+
+// downloads the given bundles, and the pinned ones whose hash changed since they were cached
+function update(names) {
+  return Promise.all([caches.open(pagesCacheName), fetchManifest()]).then(function(results) {
+    var cache = results[0], bundles = results[1].bundles;
+    return readPinned(cache).then(function(pinned) {
+      // the site bundle holds the overview, sidebar and service pages every pinned service needs, the shared one the
+      // data types that services link to instead of documenting them themselves
+      var wanted = Object.keys(pinned).concat(names || [], names && names.length ? ['site', 'shared'] : []);
+      var stale = wanted.filter(function(name, index) {
+        return wanted.indexOf(name) === index && bundles[name] && pinned[name] !== bundles[name].hash;
+      });
+      return Promise.all(stale.map(function(name) {
+        return cacheBundle(cache, pinned, name, bundles[name]);
+      })).then(function() {
+        return writePinned(cache, pinned);
+      });
+    });
+  });
+}
+
+self.addEventListener('install', function() {
+  self.skipWaiting();
+});
+
+self.addEventListener('activate', function(event) {
+  event.waitUntil(self.clients.claim().then(function() {
+    return update().catch(function() {});
+  }));
+});
+
+// tells the page, through the port it sent along, whether the update went through
+function reply(event, ok) {
+  if (event.ports && event.ports[0]) {
+    event.ports[0].postMessage({ok: ok});
+  }
+}
+
+self.addEventListener('message', function(event) {
+  var names;
+  if (event.data && event.data.type === 'pin') {
+    names = [event.data.service];
+  } else if (!event.data || event.data.type !== 'update') {
+    return;
+  }
+  event.waitUntil(update(names).then(function() {
+    reply(event, true);
+  }, function() {
+    reply(event, false);
+  }));
+});
+
+self.addEventListener('fetch', function(event) {
+  var request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+  if (request.url.endsWith('.md')) {
+    // pinned pages first, so that they also load without a network
+    event.respondWith(caches.match(request, {cacheName: pagesCacheName, ignoreSearch: true}).then(function(response) {
+      return response || fetch(request);
+    }));
+  } else if (request.mode === 'navigate' || request.destination === 'script' || request.destination === 'style') {
+    // the page shell and the docsify scripts: the network when there is one, the last copy otherwise
+    event.respondWith(fetch(request).then(function(response) {
+      var copy = response.clone();
+      caches.open(assetsCacheName).then(function(cache) {
+        cache.put(request, copy);
+      });
+      return response;
+    }).catch(function() {
+      return caches.match(request, {cacheName: assetsCacheName});
+    }));
+  }
+});
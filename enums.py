@@ -0,0 +1,33 @@
+from util import create_new_file, write_lines, get_enum_index, get_enums_path
+
+
+def get_enum_section(enum_name, aliases, shape):
+    section = f'## {enum_name}\n'
+    other_names = [alias for alias in aliases if alias != enum_name]
+    if other_names:
+        section += f'_Also accepted by: {", ".join(f"`{alias}`" for alias in other_names)}_\n\n'
+    section += f'A {shape.type_name} accepting one of these {len(shape.enum)} values:\n\n'
+    section += '\n'.join(f'- `{value}`' for value in shape.enum) + '\n'
+    return section
+
+
+def handle_enums(service_model, service_name, shapes_path, sidebar_lines):
+    enum_shapes = [service_model.shape_for(name) for name in sorted(service_model.shape_names)]
+    enum_shapes = [shape for shape in enum_shapes if getattr(shape, 'enum', None)]
+    if not enum_shapes:
+        return
+    enum_index = get_enum_index(enum_shapes[0])
+    aliases_per_enum = {}
+    for name, enum_name in enum_index.items():
+        aliases_per_enum.setdefault(enum_name, []).append(name)
+
+    enums_path = get_enums_path(shapes_path)
+    sidebar_lines.append(f'        - [Enums]({enums_path})')
+    docs_enums_path = f'docs/{enums_path}'
+    create_new_file(docs_enums_path)
+    sections = [
+        get_enum_section(shape.name, aliases_per_enum[shape.name], shape)
+        for shape in enum_shapes
+        if enum_index[shape.name] == shape.name
+    ]
+    write_lines(docs_enums_path, [f'# {service_name} enums'] + sections)
@@ -0,0 +1,61 @@
+from weakref import WeakKeyDictionary
+
+from parallel import record_cache_entry, register_cache
+
+max_depth = 4
+max_optional_members = 2
+scalar_examples = {
+    'string': "'...'",
+    'boolean': 'True',
+    'integer': '123',
+    'long': '123',
+    'float': '123.0',
+    'double': '123.0',
+    'timestamp': 'datetime(2015, 1, 1)',
+    'blob': "b'bytes'",
+}
+# one cache per service model: shapes of the same service share their resolver, and the cache goes away with it
+_example_cache = WeakKeyDictionary()
+
+
+def get_example_value(shape, depth=0):
+    resolver = getattr(shape, '_shape_resolver', None)
+    if resolver is None:
+        return _get_example_value(shape, depth)
+    cache = _example_cache.setdefault(resolver, {})
+    key = (shape.name, depth)
+    if key not in cache:
+        cache[key] = _get_example_value(shape, depth)
+        record_cache_entry('examples', resolver, key, cache[key])
+    return cache[key]
+
+
+def merge_example_value(resolver, key, value):
+    _example_cache.setdefault(resolver, {}).setdefault(key, value)
+
+
+register_cache('examples', merge_example_value)
+
+
+def _get_example_value(shape, depth):
+    type_name = shape.type_name
+    if getattr(shape, 'enum', None):
+        return repr(shape.enum[0])
+    if type_name in scalar_examples:
+        return scalar_examples[type_name]
+    if depth >= max_depth:
+        # stops recursive shapes; deeper levels are left for the reader to fill in
+        return '[]' if type_name == 'list' else '{}'
+    if type_name == 'list':
+        return f'[{get_example_value(shape.member, depth + 1)}]'
+    if type_name == 'map':
+        return f'{{{get_example_value(shape.key, depth + 1)}: {get_example_value(shape.value, depth + 1)}}}'
+    if type_name == 'structure':
+        names = shape.required_members or list(shape.members)[:max_optional_members]
+        members = [f"'{name}': {get_example_value(shape.members[name], depth + 1)}" for name in names]
+        return f'{{{", ".join(members)}}}'
+    return '{}'
+
+
+def get_example_imports(param_str):
+    return 'from datetime import datetime\n' if 'datetime(' in param_str else ''
@@ -0,0 +1,137 @@
+import argparse
+import difflib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from manifest import find_files, get_tree_digest, hash_file
+
+main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+# the serial generator, which every faster configuration must give the same site as
+reference_args = ['--workers', '1']
+# the date shown in the overview page, the only thing that differs between two builds of the same models
+default_timestamp = '1700000000'
+max_diff_lines = 40
+
+
+def start_build(build_path, main_args, env):
+    os.makedirs(build_path)
+    # the child keeps its own copy of the log file descriptor
+    with open(f'{build_path}/build.log', 'w') as log:
+        return subprocess.Popen(
+            [sys.executable, main_path] + main_args, cwd=build_path, env=env, stdout=log, stderr=log
+        )
+
+
+def run_builds(builds, env):
+    # both at once: they only share the models, which are read-only
+    processes = [(build_path, main_args, start_build(build_path, main_args, env)) for build_path, main_args in builds]
+    for build_path, main_args, process in processes:
+        if process.wait():
+            with open(f'{build_path}/build.log') as f:
+                log_tail = ''.join(f.readlines()[-20:])
+            raise RuntimeError(f'build with {" ".join(main_args)} failed:\n{log_tail}')
+
+
+def hash_trees(docs_paths, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    names = [sorted(find_files(docs_path)) for docs_path in docs_paths]
+    paths = [f'{docs_path}/{name}' for docs_path, tree_names in zip(docs_paths, names) for name in tree_names]
+    # the files of all the trees in one pool, so that a large tree does not keep the others waiting
+    with ProcessPoolExecutor(workers) as executor:
+        hashes = iter(executor.map(hash_file, paths, chunksize=64))
+        return [{name: next(hashes) for name in tree_names} for tree_names in names]
+
+
+def diff_trees(reference_hashes, optimized_hashes):
+    changed = sorted(
+        name
+        for name in reference_hashes.keys() & optimized_hashes.keys()
+        if reference_hashes[name] != optimized_hashes[name]
+    )
+    missing = sorted(reference_hashes.keys() - optimized_hashes.keys())
+    extra = sorted(optimized_hashes.keys() - reference_hashes.keys())
+    return changed, missing, extra
+
+
+def read_lines(path):
+    try:
+        with open(path) as f:
+            return f.readlines()
+    except UnicodeDecodeError:
+        return None
+
+
+def get_page_diff(reference_path, optimized_path, name, max_lines=max_diff_lines):
+    reference_lines, optimized_lines = read_lines(f'{reference_path}/{name}'), read_lines(f'{optimized_path}/{name}')
+    if reference_lines is None or optimized_lines is None:
+        return [f'binary file {name} differs\n']
+    # no context: the pages are long, and the changed lines say enough
+    diff = list(difflib.unified_diff(reference_lines, optimized_lines, f'reference/{name}', f'optimized/{name}', n=0))
+    if len(diff) > max_lines:
+        diff = diff[:max_lines] + [f'... {len(diff) - max_lines} more diff lines\n']
+    return diff
+
+
+def print_report(reference_path, optimized_path, changed, missing, extra, max_lines=max_diff_lines):
+    for name in missing:
+        print(f'only in the reference build: {name}')
+    for name in extra:
+        print(f'only in the optimized build: {name}')
+    for name in changed:
+        sys.stdout.writelines(get_page_diff(reference_path, optimized_path, name, max_lines))
+
+
+def compare_builds(
+    optimized_args, services=None, timestamp=default_timestamp, work_path=None, max_lines=max_diff_lines
+):
+    work_path = work_path or tempfile.mkdtemp(prefix='golden-')
+    service_args = ['--services', ','.join(services)] if services else []
+    env = dict(os.environ, SOURCE_DATE_EPOCH=timestamp)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    reference_path, optimized_path = f'{work_path}/reference', f'{work_path}/optimized'
+    run_builds([(reference_path, reference_args + service_args), (optimized_path, optimized_args + service_args)], env)
+    reference_docs_path, optimized_docs_path = f'{reference_path}/docs', f'{optimized_path}/docs'
+    reference_hashes, optimized_hashes = hash_trees([reference_docs_path, optimized_docs_path])
+    changed, missing, extra = diff_trees(reference_hashes, optimized_hashes)
+    print(f'reference digest: {get_tree_digest(reference_hashes)}')
+    print(f'optimized digest: {get_tree_digest(optimized_hashes)}')
+    print_report(reference_docs_path, optimized_docs_path, changed, missing, extra, max_lines)
+    print(
+        f'{len(reference_hashes)} files in the reference build: {len(changed)} differ, {len(missing)} missing and '
+        f'{len(extra)} extra in the optimized build ({work_path})'
+    )
+    return changed, missing, extra, work_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Builds the docs with the serial generator and with another configuration, each in a folder of '
+        'its own, and reports the pages that differ. The main.py arguments of the configuration to check go after '
+        '--, like: golden.py --services s3,sqs -- --workers 8 --max-rss 500',
+    )
+    parser.add_argument('--services', type=lambda x: x.split(','), help='comma-separated list of services to build')
+    parser.add_argument(
+        '--data-path', help='extra botocore models to build from, like a pinned copy of them (sets AWS_DATA_PATH)'
+    )
+    parser.add_argument(
+        '--timestamp', default=os.environ.get('SOURCE_DATE_EPOCH', default_timestamp), help='build date of both builds'
+    )
+    parser.add_argument('--max-diff-lines', type=int, default=max_diff_lines, help='diff lines shown per page')
+    parser.add_argument('--keep', action='store_true', help='keep both builds, even when they are identical')
+    argv = sys.argv[1:]
+    split_index = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split_index])
+    optimized_args = argv[split_index + 1 :] or ['--workers', str(os.cpu_count() or 1)]
+    if args.data_path:
+        os.environ['AWS_DATA_PATH'] = os.path.abspath(args.data_path)
+    changed_files, missing_files, extra_files, build_path = compare_builds(
+        optimized_args, args.services, args.timestamp, max_lines=args.max_diff_lines
+    )
+    identical = not (changed_files or missing_files or extra_files)
+    if identical and not args.keep:
+        shutil.rmtree(build_path)
+    sys.exit(0 if identical else 1)
@@ -0,0 +1,209 @@
+import re
+from html.parser import HTMLParser
+
+from parallel import record_cache_entry, register_cache
+
+block_tags = {'p', 'div', 'dl', 'dd', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+inline_markers = {'b': '**', 'strong': '**', 'i': '_', 'em': '_'}
+callout_titles = {'note': 'Note', 'important': 'Important'}
+ignored_tags = {'fullname'}
+escape_regex = re.compile(r'([\\`*_\[\]])')
+# stands for the indentation of blocks inside list items until get_markdown, which strips the other leading spaces
+block_indent_marker = '\0'
+line_regex = re.compile(r'^( *)(- |\d+\. )? *(.*?) *$')
+# keyed by the html: the same documentation strings come up over and over across shapes and services
+_markdown_cache = {}
+# the oldest entries go first past this, so that a build of all the services does not keep every string it converted
+max_markdown_cache_entries = 16384
+
+
+class MarkdownConverter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.buffers = [[]]
+        self.lists = []
+        self.hrefs = []
+        self.ignored_depth = 0
+        self.pre_depth = 0
+        self.code_depth = 0
+        # inside a list item: nothing written yet after its marker, and a block ended that later text must not join
+        self.item_start = False
+        self.pending_break = False
+
+    def write(self, text):
+        self.buffers[-1].append(text)
+
+    def get_list_indent(self):
+        return ''.join(' ' * width for _, _, width in self.lists[:-1])
+
+    def get_block_indent(self):
+        return block_indent_marker * sum(width for _, _, width in self.lists)
+
+    def write_block_break(self):
+        self.pending_break = False
+        if self.item_start:
+            # the first block of an item goes on the line of its marker
+            self.item_start = False
+        elif self.lists:
+            self.write(f'\n\n{self.get_block_indent()}')
+        else:
+            self.write('\n\n')
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ignored_tags:
+            self.ignored_depth += 1
+        elif tag in block_tags:
+            self.write_block_break()
+            if tag == 'pre':
+                self.pre_depth += 1
+                self.write(f'```\n{self.get_block_indent()}')
+        elif tag in callout_titles:
+            self.write_block_break()
+            self.write(f'**{callout_titles[tag]}:** ')
+            # in a list item, the first paragraph of the callout goes on the line of its title
+            self.item_start = bool(self.lists)
+        elif tag == 'dt':
+            self.write_block_break()
+            self.buffers.append([])
+        elif tag in ('ul', 'ol'):
+            self.pending_break = False
+            self.lists.append([tag, 0, 2 if tag == 'ul' else 3])
+            self.write('\n')
+        elif tag == 'li' and self.lists:
+            current_list = self.lists[-1]
+            current_list[1] += 1
+            marker = '- ' if current_list[0] == 'ul' else f'{current_list[1]}. '
+            self.write(f'\n{self.get_list_indent()}{marker}')
+            self.item_start, self.pending_break = True, False
+        elif tag == 'br':
+            self.write('\n')
+        elif tag in inline_markers:
+            self.flush_pending_break()
+            self.buffers.append([])
+        elif tag == 'code' and not self.pre_depth:
+            # inside a fenced block already: no inline backticks
+            self.flush_pending_break()
+            self.code_depth += 1
+            self.buffers.append([])
+        elif tag == 'a':
+            self.flush_pending_break()
+            self.hrefs.append(dict(attrs).get('href') or '')
+            self.buffers.append([])
+
+    def handle_endtag(self, tag):
+        if tag in ignored_tags:
+            self.ignored_depth = max(0, self.ignored_depth - 1)
+        elif tag in block_tags and self.lists:
+            if tag == 'pre' and self.pre_depth:
+                self.pre_depth -= 1
+                self.write(f'\n{self.get_block_indent()}```')
+            self.item_start, self.pending_break = False, True
+        elif tag in block_tags:
+            if tag == 'pre' and self.pre_depth:
+                self.pre_depth -= 1
+                self.write('\n```')
+            self.write('\n\n')
+        elif tag in callout_titles and self.lists:
+            self.item_start, self.pending_break = False, True
+        elif tag in callout_titles:
+            self.write('\n\n')
+        elif tag == 'dt':
+            self.close_inline('**', '**')
+        elif tag in ('ul', 'ol') and self.lists:
+            self.lists.pop()
+            self.write('\n' if self.lists else '\n\n')
+        elif tag in inline_markers:
+            self.close_inline(inline_markers[tag], inline_markers[tag])
+        elif tag == 'code' and self.code_depth and not self.pre_depth:
+            self.code_depth -= 1
+            self.close_inline('`', '`')
+        elif tag == 'a' and self.hrefs:
+            href = self.hrefs.pop()
+            if href.startswith(('http://', 'https://', 'mailto:')):
+                self.close_inline('[', f']({href})')
+            else:
+                # relative links point into the AWS docs site and would be broken here
+                self.close_inline('', '')
+
+    def close_inline(self, prefix, suffix):
+        if len(self.buffers) < 2:
+            return
+        text = ''.join(self.buffers.pop())
+        content = text.strip()
+        if not content:
+            self.write(text)
+            return
+        if prefix == '`' and '`' in content:
+            prefix, suffix = '`` ', ' ``'
+        # markdown emphasis must not start or end with a space, so move the spaces outside of the markers
+        leading = text[: len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()) :]
+        self.write(f'{leading}{prefix}{content}{suffix}{trailing}')
+
+    def flush_pending_break(self):
+        if self.pending_break:
+            self.write_block_break()
+
+    def handle_data(self, data):
+        if self.ignored_depth:
+            return
+        if self.pre_depth:
+            self.write(data.replace('\n', f'\n{self.get_block_indent()}'))
+            return
+        text = re.sub(r'\s+', ' ', data)
+        if text.strip():
+            self.flush_pending_break()
+            self.item_start = False
+        if self.code_depth:
+            self.write(text)
+        else:
+            self.write(escape_regex.sub(r'\\\1', text).replace('<', '&lt;'))
+
+    def get_markdown(self):
+        while len(self.buffers) > 1:
+            self.close_inline('', '')
+        lines = []
+        in_code_block = False
+        for line in ''.join(self.buffers[0]).split('\n'):
+            content_line = line.lstrip(block_indent_marker)
+            block_indent = ' ' * (len(line) - len(content_line))
+            line = content_line
+            if line.startswith('```'):
+                in_code_block = not in_code_block
+            if not in_code_block:
+                indent, marker, content = line_regex.match(line).groups()
+                line = f'{indent}{marker}{content}' if marker else content
+            lines.append(f'{block_indent}{line}' if line else line)
+        return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def html_to_markdown(html):
+    if not html:
+        return ''
+    markdown = _markdown_cache.get(html)
+    if markdown is None:
+        converter = MarkdownConverter()
+        converter.feed(html)
+        converter.close()
+        markdown = converter.get_markdown()
+        cache_markdown(None, html, markdown)
+        record_cache_entry('markdown', None, html, markdown)
+    return markdown
+
+
+def cache_markdown(_, html, markdown):
+    if len(_markdown_cache) >= max_markdown_cache_entries:
+        del _markdown_cache[next(iter(_markdown_cache))]
+    _markdown_cache[html] = markdown
+
+
+register_cache('markdown', cache_markdown)
+
+
+def quote_markdown(markdown):
+    # for documentation rendered inside a blockquote: every line of it has to stay in the quote
+    return markdown.replace('\n', '\n> ')
+
+
+def clear_markdown_cache():
+    _markdown_cache.clear()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+entry_points = ['main', 'watch', 'links', 'compress', 'manifest', 'catalog_db', 'deploy', 'golden']
+# cold start budget of every entry point: boto3 and botocore alone take well over this, so they must stay lazy
+import_budget_ms = 150
+# import time: <self us> | <cumulative us> | <two spaces per nesting level><module>
+import_line_regex = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def measure_import(module, repeat=3):
+    # the best of a few runs, so that the first one also compiles the bytecode and the numbers are not just noise
+    return min((measure_import_once(module) for _ in range(repeat)), key=lambda x: x[0])
+
+
+def measure_import_once(module):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    total, dependencies = 0, []
+    for line in result.stderr.splitlines():
+        match = import_line_regex.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match[2]), (len(match[3]) - 1) // 2, match[4]
+        if depth == 0 and name == module:
+            total = cumulative
+        elif depth == 0:
+            # nested imports are printed before their parent: drop those of the interpreter startup modules
+            dependencies = []
+        elif depth == 1:
+            dependencies.append((cumulative, name))
+    return total, sorted(dependencies, reverse=True)
+
+
+def get_import_times(modules=None):
+    return {module: measure_import(module) for module in modules or entry_points}
+
+
+def print_import_report(import_times, budget_ms=import_budget_ms):
+    print(f'{"entry point":<16}{"import ms":>10}  heaviest imports')
+    over_budget = []
+    for module, (total, dependencies) in import_times.items():
+        heaviest = ', '.join(f'{name} {cumulative / 1000:.1f}' for cumulative, name in dependencies[:3])
+        print(f'{module:<16}{total / 1000:>10.1f}  {heaviest}')
+        if total / 1000 > budget_ms:
+            over_budget.append(module)
+    if over_budget:
+        print(f'over the {budget_ms} ms import budget: {", ".join(over_budget)}')
+    return over_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reports how long the generator entry points take to import')
+    parser.add_argument('modules', nargs='*', help=f'modules to measure instead of {", ".join(entry_points)}')
+    parser.add_argument('--budget-ms', type=float, default=import_budget_ms)
+    args = parser.parse_args()
+    sys.exit(1 if print_import_report(get_import_times(args.modules), args.budget_ms) else 0)
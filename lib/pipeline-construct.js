@@ -14,18 +14,19 @@ const {
 class PipelineConstruct extends Construct {
   constructor(scope, bucket, distribution) {
     super(scope, "pipeline");
+    // uploads only what changed since the last deploy, gzipped, and invalidates only those paths
+    let deploy = `python deploy.py ${bucket.bucketName}`;
+    if (distribution) {
+      deploy += ` --distribution-id ${distribution.distributionId}`;
+    }
     let commands = [
       // "cdk bootstrap",
-      "python main.py",
+      // the bundles and prefetch manifests the site reads, compressed like the pages
+      "python main.py --bundle --prefetch --compress",
       "npm run cdk diff || true",
       "npm run cdk deploy",
-      `aws s3 cp --acl public-read --recursive docs/ s3://${bucket.bucketName}`
+      deploy
     ];
-    if (distribution) {
-      commands.push(
-        `aws cloudfront create-invalidation --distribution-id ${distribution.distributionId} --paths "/*"`
-      );
-    }
     let project = new Project(this, "deploy-site", {
       description: "Deploys website at botodocs.com",
       timeout: Duration.minutes(30),
@@ -0,0 +1,133 @@
+import os
+import re
+import sys
+
+link_regex = re.compile(r'\]\(([^()\s]+)\)')
+heading_regex = re.compile(r'^(#{1,6}) +(.+?) *$')
+custom_id_regex = re.compile(r' :id=(\S+)')
+fence_regex = re.compile(r'^ *(```|~~~)')
+# same character class as docsify's slugify so that anchors match what the browser generates
+slug_special_chars_regex = re.compile('[\u2000-\u206f\u2e00-\u2e7f\\\\\'!"#$%&()*+,./:;<=>?@\\[\\]^`{|}~]')
+
+_anchors = {}
+
+
+def slugify(text):
+    slug = text.strip().lower()
+    slug = re.sub(r'<[^>\d]+>', '', slug)
+    slug = slug_special_chars_regex.sub('', slug)
+    slug = re.sub(r'\s', '-', slug)
+    slug = re.sub(r'-+', '-', slug)
+    return re.sub(r'^(\d)', r'_\1', slug)
+
+
+def get_page_name(path, docs_path):
+    return os.path.relpath(path, docs_path)[: -len('.md')].replace(os.sep, '/')
+
+
+def find_pages(docs_path):
+    for directory, _, file_names in os.walk(docs_path):
+        for file_name in file_names:
+            if file_name.endswith('.md'):
+                yield os.path.join(directory, file_name)
+
+
+def read_page(path):
+    # returns the anchors the page defines and the links it makes
+    anchors, links, counts = set(), [], {}
+    in_code_block = False
+    with open(path) as f:
+        for line in f:
+            if fence_regex.match(line):
+                in_code_block = not in_code_block
+                continue
+            if in_code_block:
+                continue
+            heading = heading_regex.match(line)
+            if heading:
+                title = heading.group(2)
+                custom_id = custom_id_regex.search(title)
+                if custom_id:
+                    anchors.add(custom_id.group(1).lower())
+                else:
+                    slug = slugify(title)
+                    count = counts.get(slug, 0)
+                    counts[slug] = count + 1
+                    anchors.add(f'{slug}-{count}' if count else slug)
+            if '](' in line:
+                links.extend(link_regex.findall(line))
+    return anchors, links
+
+
+def resolve_link(link):
+    page, _, anchor = link.partition('#')
+    if page.startswith('/'):
+        page = page[1:]
+    if page.endswith('.md'):
+        page = page[: -len('.md')]
+    return page, anchor
+
+
+def is_external(link):
+    return ':' in link.partition('#')[0] or link.startswith('#')
+
+
+def check_page_links(item):
+    page, links = item
+    broken = []
+    for link in links:
+        if is_external(link):
+            continue
+        target, anchor = resolve_link(link)
+        anchors = _anchors.get(target)
+        if anchors is None:
+            anchors = _anchors.get(f'{target}/README')
+        if anchors is None:
+            broken.append((page, link, 'missing page'))
+        elif anchor and slugify(anchor) not in anchors and anchor.lower() not in anchors:
+            broken.append((page, link, 'missing anchor'))
+    return broken
+
+
+def get_service_of(page):
+    parts = page.split('/')
+    return parts[1] if len(parts) > 2 and parts[0] == 'services' else '(site)'
+
+
+def check_links(docs_path='docs', workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    paths = sorted(find_pages(docs_path))
+    pages = [get_page_name(path, docs_path) for path in paths]
+    context = get_context('fork')
+    with ProcessPoolExecutor(workers, mp_context=context) as executor:
+        results = list(executor.map(read_page, paths, chunksize=64))
+    _anchors.clear()
+    _anchors.update({page: anchors for page, (anchors, _) in zip(pages, results)})
+    # the anchor index is inherited by the forked workers instead of being pickled for every task
+    with ProcessPoolExecutor(workers, mp_context=context) as executor:
+        items = [(page, links) for page, (_, links) in zip(pages, results)]
+        broken_per_page = list(executor.map(check_page_links, items, chunksize=64))
+
+    broken_per_service = {}
+    for broken in broken_per_page:
+        for page, link, reason in broken:
+            broken_per_service.setdefault(get_service_of(page), []).append((page, link, reason))
+    link_count = sum(len(links) for _, links in results)
+    return len(pages), link_count, broken_per_service
+
+
+def print_link_report(page_count, link_count, broken_per_service, max_examples=5):
+    broken_count = sum(len(broken) for broken in broken_per_service.values())
+    print(f'checked {link_count} links in {page_count} pages: {broken_count} broken')
+    for service, broken in sorted(broken_per_service.items()):
+        print(f'  {service}: {len(broken)} broken links')
+        for page, link, reason in broken[:max_examples]:
+            print(f'    {page}: {link} ({reason})')
+
+
+if __name__ == "__main__":
+    page_count, link_count, broken_per_service = check_links(*sys.argv[1:2])
+    print_link_report(page_count, link_count, broken_per_service)
+    sys.exit(1 if broken_per_service else 0)
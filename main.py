@@ -1,15 +1,31 @@
+import argparse
+import os
 import sys
-from datetime import datetime
+import traceback
+from datetime import datetime, timezone
 
-import boto3
-from botocore.model import ServiceModel
+import parallel
+from bundle import write_bundles
+from catalog import clear_catalog, write_service_catalog, write_catalog_index
+from catalog_db import clear_catalog_db, write_service_catalog_db
+from checkpoint import clear_checkpoints, load_checkpoint, run_phase, mark_done, get_fragment_lines, phase_names
+from clients import sidebar_path, handle_client, services_path, get_operation_output_shapes, handle_shared_shapes
+from compress import compress_tree, print_size_report
+from enums import handle_enums
+from html_docs import html_to_markdown
+from importtime import get_import_times, print_import_report
+from manifest import check_digest
+from memory import is_over_rss_limit, new_scoped_session, release_service_state, restart_to_resume, get_rss_bytes
 
-from clients import sidebar_path, handle_client, services_path
-
-from paginators import handle_paginators
-from resources import handle_resources
+from paginators import handle_paginators, get_paginator_config
+from prefetch import write_prefetch_files
+from references import build_reference_index
+from resource_graph import build_resource_graph
+from resources import handle_resources, get_service_resource
+from shard import parse_shard, get_shard_services, write_shard_fragments, read_shard_fragments, get_build_id
+from shared_shapes import build_shared_shapes, shared_shapes_path
 from util import create_new_file, write_lines, get_service_name, write_to_file
-from waiters import handle_waiters
+from waiters import handle_waiters, get_waiters
 
 
 def create_sidebar():
@@ -22,10 +38,15 @@ def create_services_page():
     return ['# List of supported services']
 
 
-def create_readme():
+def create_readme(timestamp=None):
+    import boto3
+
     path = 'docs/README.md'
     create_new_file(path)
-    date = datetime.utcnow().strftime('%Y-%m-%d at %H:%M UTC')
+    build_time = (
+        datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else datetime.now(timezone.utc)
+    )
+    date = build_time.strftime('%Y-%m-%d at %H:%M UTC')
     write_to_file(
         path,
         f"""# Overview
@@ -56,52 +77,343 @@ https://boto3.amazonaws.com/v1/documentation/api/latest/index.html
     )
 
 
-def go():
+def get_client_names(args):
+    import boto3
+
     boto3.setup_default_session()
     clients = boto3.DEFAULT_SESSION.get_available_services()
+    if args.services:
+        clients = [name for name in clients if name in args.services]
+    return clients
+
+
+def go(args):
+    clients = get_client_names(args)
+    build_id = get_build_id(args.timestamp, clients)
+    if args.share_shapes:
+        # over all the services of the build, so that every shard links to the same shared data types
+        print(f'{build_shared_shapes(clients)} data types are shared by several services')
+    if args.shard:
+        clients = get_shard_services(clients, args.shard)
+        print(f'shard {args.shard[0]} of {args.shard[1]}: building {len(clients)} services')
+    if args.shard and not args.resume:
+        # other shards may be running from the same folder: only start this one's services afresh
+        clear_checkpoints(clients)
+    elif not args.resume:
+        clear_checkpoints()
+        if args.catalog:
+            clear_catalog(args.catalog)
+        if args.sqlite:
+            clear_catalog_db(args.sqlite)
+    fragments = {}
+    failures = {}
+    handled_count = 0
+    for index, client_name in enumerate(clients):
+        checkpoint = load_checkpoint(client_name)
+        # a service finished by an earlier run still gets the phases that run did not have, like --catalog
+        if checkpoint['done'] and all(phase in checkpoint['phases'] for phase in get_phase_names(args)):
+            print('skipping completed service', client_name)
+        else:
+            handled_count += 1
+            try:
+                handle_service_phases(client_name, checkpoint, args)
+            except Exception:
+                failures[client_name] = traceback.format_exc()
+                print(f'failed to handle service {client_name}:\n{failures[client_name]}', file=sys.stderr)
+                continue
+            finally:
+                if args.max_rss:
+                    release_service_state()
+            # never right after a failure, so that a service failing for good cannot restart the build forever
+            if args.max_rss and index < len(clients) - 1 and is_over_rss_limit(args.max_rss):
+                print(f'{get_rss_bytes() >> 20} MB resident after {handled_count} services, restarting to resume')
+                restart_to_resume()
+        fragments[client_name] = {key: get_fragment_lines(checkpoint, key) for key in ['sidebar', 'services']}
+    # without --share-shapes, a shared page left by an earlier build is not this build's to write or remove
+    if args.share_shapes and (not args.shard or args.shard[0] == 1):
+        handle_shared_shapes()
+    if args.shard:
+        # the index pages need every service: they are written by --merge, once all the shards are done
+        write_shard_fragments(args.shard, fragments, failures, build_id)
+    else:
+        write_index_pages(fragments, args.timestamp, args.share_shapes)
+        if args.catalog:
+            write_catalog_index(args.catalog, fragments)
+        if args.prefetch:
+            write_prefetch_files()
+        if args.bundle:
+            write_bundles()
+    if args.compress:
+        print_size_report(compress_tree())
+    if args.import_report:
+        print_import_report(get_import_times())
+    if failures:
+        print(f'{len(failures)} services failed: {", ".join(failures)}. Rerun with --resume to retry them only.')
+    return failures
+
+
+def merge(args):
+    fragments, failures = read_shard_fragments(get_build_id(args.timestamp, get_client_names(args)))
+    write_index_pages(fragments, args.timestamp, args.share_shapes)
+    if args.catalog:
+        write_catalog_index(args.catalog, fragments)
+    if args.prefetch:
+        write_prefetch_files()
+    if args.bundle:
+        write_bundles()
+    if args.compress:
+        print_size_report(compress_tree())
+    if failures:
+        print(
+            f'{len(failures)} services failed: {", ".join(failures)}. Rerun their shards with --resume to retry them.'
+        )
+    return failures
+
+
+def write_index_pages(fragments, timestamp, share_shapes=False):
     sidebar_lines = create_sidebar()
+    if share_shapes and os.path.exists(f'docs/{shared_shapes_path}'):
+        sidebar_lines.append(f'- [Shared data types]({shared_shapes_path})')
     services_lines = create_services_page()
-    create_readme()
-    for index, client_name in enumerate(clients):
-        # if client_name not in ['ec2', 'accessanalyzer', 'glacier', 'ssm', 'wafv2', 'cloudformation']:
-        #   continue
-        client = boto3.client(client_name)
-        class_name = type(client).__name__
-        service_model: ServiceModel = client._service_model
-        name_in_path = service_model.endpoint_prefix
-        service_path = f'services/{name_in_path}'
-        shapes_path = f'{service_path}/data-types.md'
-        service_name = get_service_name(service_model)
+    for client_name in sorted(fragments):
+        sidebar_lines.extend(fragments[client_name]['sidebar'])
+        services_lines.extend(fragments[client_name]['services'])
+    write_lines(sidebar_path, sidebar_lines)
+    write_lines(services_path, services_lines)
+    create_readme(timestamp)
+
 
+def get_resource_graph(resource, service_path):
+    resource_model = resource.meta.resource_model if resource else None
+    return build_resource_graph(resource_model, f'{service_path}/resource')
+
+
+def load_service(client_name, session=None):
+    import boto3
+
+    client = (session or boto3).client(client_name)
+    service_model = client._service_model
+    name_in_path = service_model.endpoint_prefix
+    resource = get_service_resource(client_name, session)
+    return {
+        'client': client,
+        'client_name': client_name,
+        'class_name': type(client).__name__,
+        'service_model': service_model,
+        'service_path': f'services/{name_in_path}',
+        'shapes_path': f'services/{name_in_path}/data-types.md',
+        'service_name': get_service_name(service_model),
+        'resource': resource,
+        'resource_graph': get_resource_graph(resource, f'services/{name_in_path}'),
+        'paginator_config': get_paginator_config(client),
+        'output_shapes': get_operation_output_shapes(service_model),
+        'waiters': get_waiters(client),
+    }
+
+
+def get_service_phases(service, args=None):
+    client, client_name, class_name = service['client'], service['client_name'], service['class_name']
+    service_model, service_name, resource = service['service_model'], service['service_name'], service['resource']
+    service_path, shapes_path = service['service_path'], service['shapes_path']
+
+    def service_phase(sidebar_lines, services_lines):
         handle_service(client, service_path, service_model, sidebar_lines, services_lines)
-        handle_client(client, client_name, class_name, service_path, sidebar_lines, shapes_path)
 
-        handle_paginators(client_name, class_name, service_name, service_path, sidebar_lines)
-        handle_waiters(client, client_name, class_name, service_name, service_path, sidebar_lines)
-        handle_resources(client, client_name, class_name, service_name, service_path, sidebar_lines)
+    def client_phase(sidebar_lines, services_lines):
+        references = build_reference_index(service_model, service['resource_graph'], service_path)
+        handle_client(client, client_name, class_name, service_path, sidebar_lines, shapes_path, references)
+
+    def paginators_phase(sidebar_lines, services_lines):
+        paginator_config, output_shapes = service['paginator_config'], service['output_shapes']
+        handle_paginators(
+            paginator_config, output_shapes, client_name, class_name, service_name, service_path, sidebar_lines
+        )
+
+    def waiters_phase(sidebar_lines, services_lines):
+        handle_waiters(service['waiters'], client_name, class_name, service_name, service_path, sidebar_lines)
+
+    def resources_phase(sidebar_lines, services_lines):
+        handle_resources(
+            client,
+            resource,
+            client_name,
+            class_name,
+            service_name,
+            service_path,
+            sidebar_lines,
+            service['waiters'],
+            service['resource_graph'],
+        )
+
+    def data_types_phase(sidebar_lines, services_lines):
         sidebar_lines.append(f'        - [Data Types]({shapes_path})')
-    write_lines(sidebar_path, sidebar_lines)
-    write_lines(services_path, services_lines)
+
+    def enums_phase(sidebar_lines, services_lines):
+        handle_enums(service_model, service_name, shapes_path, sidebar_lines)
+
+    def catalog_phase(sidebar_lines, services_lines):
+        write_service_catalog(service, args.catalog)
+
+    phases = [
+        ('service', service_phase),
+        ('client', client_phase),
+        ('paginators', paginators_phase),
+        ('waiters', waiters_phase),
+        ('resources', resources_phase),
+        ('data-types', data_types_phase),
+        ('enums', enums_phase),
+    ]
+
+    def sqlite_phase(sidebar_lines, services_lines):
+        write_service_catalog_db(service, args.sqlite)
+
+    if args and args.catalog:
+        phases.append(('catalog', catalog_phase))
+    if args and args.sqlite:
+        phases.append(('sqlite', sqlite_phase))
+    return phases
+
+
+def get_phase_names(args):
+    optional_phases = {'catalog': args.catalog, 'sqlite': args.sqlite}
+    return [phase for phase in phase_names if optional_phases.get(phase, True)]
+
+
+def handle_service_phases(client_name, checkpoint, args):
+    service = load_service(client_name, new_scoped_session() if args.max_rss else None)
+    for phase, fn in get_service_phases(service, args):
+        run_phase(client_name, checkpoint, phase, fn)
+    mark_done(client_name, checkpoint)
 
 
 def handle_service(client, service_path, service_model, sidebar_lines, services_lines):
     service_name = get_service_name(service_model)
-    service_documentation_html = client.meta._service_model.documentation
+    service_documentation = html_to_markdown(client.meta._service_model.documentation)
     sidebar_lines.append(f'    - [{service_name}]({service_path})')
     services_lines.append(f'  - [{service_name}]({service_path})')
     docs_service_path = f'docs/{service_path}.md'
     create_new_file(docs_service_path)
-    write_lines(docs_service_path, [f'# {service_name}', service_documentation_html])
+    write_lines(docs_service_path, [f'# {service_name}', service_documentation])
+
+
+def start_docsify():
+    from shutil import which
+    from subprocess import Popen
+
+    command = ['docsify'] if which('docsify') else ['npx', 'docsify-cli']
+    return Popen(command + ['serve', 'docs'])
 
 
 def serve_docs():
-    from subprocess import run
+    start_docsify().wait()
+
 
-    # that's for my own convenience :)
-    run('/home/jeshan/.nvm/versions/node/v10.13.0/bin/docsify serve docs'.split(' '))
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Generates the botodocs site in the docs folder')
+    parser.add_argument(
+        '--resume', action='store_true', help='skip the services and phases completed by a previous interrupted build'
+    )
+    parser.add_argument('--serve', action='store_true', help='serve the site with docsify once generated')
+    parser.add_argument(
+        '--services', type=lambda x: x.split(','), help='comma-separated list of services to build instead of all'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='serve the site and regenerate the pages of the selected services whenever a generator module changes',
+    )
+    parser.add_argument(
+        '--catalog',
+        metavar='PATH',
+        help='also write a newline-delimited JSON catalog per service, plus an index.json, to this folder',
+    )
+    parser.add_argument(
+        '--sqlite', metavar='PATH', help='also fill an SQLite database with the catalog; query it with catalog_db.py'
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='write precompressed .gz (and .br when brotli is installed) files next to every page and report the savings',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='processes rendering the operations, data types and resource actions of large services, on Linux; the '
+        'default of 1 renders everything in a single process',
+    )
+    parser.add_argument(
+        '--timestamp',
+        type=int,
+        default=os.environ.get('SOURCE_DATE_EPOCH'),
+        help='build time, in seconds since the epoch, to print in the overview page instead of the current time; '
+        'defaults to $SOURCE_DATE_EPOCH',
+    )
+    parser.add_argument(
+        '--expect-digest',
+        metavar='DIGEST',
+        help='hash the generated docs folder and fail unless it matches this digest, as printed by manifest.py',
+    )
+    parser.add_argument(
+        '--import-report',
+        action='store_true',
+        help='report how long each entry point of the generator takes to import, against the cold start budget',
+    )
+    parser.add_argument(
+        '--max-rss',
+        type=int,
+        metavar='MB',
+        help='load every service in a session of its own and release it once written; when the resident memory still '
+        'goes over this many megabytes, restart the build to resume with the remaining services',
+    )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='write the manifests of the pages most likely to be visited next, which the site prefetches when idle',
+    )
+    parser.add_argument(
+        '--bundle',
+        action='store_true',
+        help='write a compressed bundle of the pages of every service, with a manifest of their hashes, so that the '
+        'site can keep pinned services offline',
+    )
+    parser.add_argument(
+        '--share-shapes',
+        action='store_true',
+        help='document the data types that several services define the same way once, on a shared page, and link '
+        'there from every service',
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help='build only the I-th of N shards of the services, balanced by their size, and write its sidebar and '
+        'services fragments for --merge instead of the index pages',
+    )
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='write the sidebar, services and overview pages from the fragments of all the shards of a --shard build',
+    )
+    args = parser.parse_args(argv)
+    if args.watch and not args.services:
+        parser.error('--watch requires --services')
+    if args.shard and (args.watch or args.merge or args.sqlite):
+        parser.error('--shard cannot be combined with --watch, --merge or --sqlite')
+    return args
 
 
 if __name__ == "__main__":
-    go()
-    if len(sys.argv) > 1 and sys.argv[1]:
+    args = parse_args(sys.argv[1:])
+    # the watcher keeps a docsify process and reloads the generator modules, which forked workers would not see
+    parallel.worker_count = 1 if args.watch else args.workers
+    if args.watch:
+        from watch import watch
+
+        sys.exit(watch(args.services, args.timestamp))
+    failures = merge(args) if args.merge else go(args)
+    if args.expect_digest and not check_digest(args.expect_digest):
+        sys.exit(1)
+    if args.serve:
         serve_docs()
+    sys.exit(1 if failures else 0)
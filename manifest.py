@@ -0,0 +1,62 @@
+import argparse
+import hashlib
+import os
+import sys
+
+
+def find_files(docs_path):
+    for directory, _, file_names in os.walk(docs_path):
+        for file_name in file_names:
+            path = os.path.join(directory, file_name)
+            yield os.path.relpath(path, docs_path).replace(os.sep, '/')
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_file_hashes(docs_path='docs'):
+    return {name: hash_file(f'{docs_path}/{name}') for name in sorted(find_files(docs_path))}
+
+
+def get_manifest_lines(file_hashes):
+    # the same format as sha256sum, so that two builds can be compared with diff or checked with sha256sum -c
+    return [f'{file_hash}  {name}' for name, file_hash in file_hashes.items()]
+
+
+def get_tree_digest(file_hashes):
+    # covers both the contents and the names of the files, in a fixed order
+    return hashlib.sha256('\n'.join(get_manifest_lines(file_hashes)).encode()).hexdigest()
+
+
+def hash_tree(docs_path='docs'):
+    return get_tree_digest(get_file_hashes(docs_path))
+
+
+def check_digest(expected_digest, docs_path='docs'):
+    digest = hash_tree(docs_path)
+    print(f'output digest: {digest}')
+    if digest != expected_digest:
+        print(f'expected digest {expected_digest}: the output is not identical to that build', file=sys.stderr)
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Hashes a generated docs folder to check that builds are reproducible')
+    parser.add_argument('docs_path', nargs='?', default='docs')
+    parser.add_argument(
+        '--list', action='store_true', help='print the hash of every file, to diff against another build'
+    )
+    parser.add_argument('--expect-digest', metavar='DIGEST', help='exit with an error if the tree has another digest')
+    args = parser.parse_args()
+    if args.list:
+        print('\n'.join(get_manifest_lines(get_file_hashes(args.docs_path))))
+    elif args.expect_digest:
+        sys.exit(0 if check_digest(args.expect_digest, args.docs_path) else 1)
+    else:
+        print(hash_tree(args.docs_path))
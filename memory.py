@@ -0,0 +1,44 @@
+import gc
+import os
+import sys
+
+from html_docs import clear_markdown_cache
+
+
+def get_rss_bytes():
+    try:
+        # the second field is the resident set size, in pages
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+
+        # no procfs: fall back on the peak size, which is in bytes on macOS and kilobytes elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def is_over_rss_limit(max_rss_mb):
+    return get_rss_bytes() > max_rss_mb * 1024 * 1024
+
+
+def new_scoped_session():
+    import boto3
+
+    # a session has its own loader, so the models it parses are released along with the service's client and resource
+    return boto3.session.Session()
+
+
+def release_service_state():
+    clear_markdown_cache()
+    # models, shapes and resource classes reference each other, so they are only freed by the cycle collector
+    gc.collect()
+
+
+def restart_to_resume():
+    # python rarely hands freed memory back to the system, so the only way to get the size back down is a new process,
+    # which picks up where this one stopped thanks to the checkpoints
+    sys.stdout.flush()
+    sys.stderr.flush()
+    argv = sys.argv if '--resume' in sys.argv else sys.argv + ['--resume']
+    os.execv(sys.executable, [sys.executable] + argv)
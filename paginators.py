@@ -1,5 +1,3 @@
-import botocore
-
 import pythonic
 from util import (
     create_new_file,
@@ -7,8 +5,11 @@ from util import (
     get_link_to_client_function,
     write_lines,
     get_accepts_redirect_link,
+    get_shape_string_link,
 )
 
+pagination_settings = ['input_token', 'output_token', 'limit_key', 'result_key', 'more_results', 'non_aggregate_keys']
+
 
 def create_paginator_index(path, client_name, service_name, example_paginator_name):
     create_new_file(path)
@@ -27,15 +28,50 @@ paginator = client.get_paginator('{pythonic.xform_name(example_paginator_name)}'
     ]
 
 
-def get_example_paginator_snippet(paginator, name, client_name, service, fn_name, service_path):
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def get_pagination_config_string(paginator):
+    lines = ['| Setting | Value |', '| --- | --- |']
+    for setting in pagination_settings:
+        if setting in paginator:
+            lines.append(f'| {setting} | {", ".join(f"`{value}`" for value in as_list(paginator[setting]))} |')
+    return '\n'.join(lines)
+
+
+def get_result_key_shape(output_shape, result_key):
+    shape = output_shape
+    for key in result_key.split('.'):
+        members = getattr(shape, 'members', None)
+        if not members or key not in members:
+            return None
+        shape = members[key]
+    return shape
+
 
+def get_result_items_string(paginator, output_shape, shapes_path):
+    lines = []
+    for result_key in as_list(paginator['result_key']):
+        shape = get_result_key_shape(output_shape, result_key) if output_shape else None
+        if not shape:
+            lines.append(f'- `{result_key}`')
+        elif shape.type_name == 'list':
+            lines.append(f'- `{result_key}`: a list of {get_shape_string_link(shape.member, shapes_path)}')
+        else:
+            lines.append(f'- `{result_key}`: {get_shape_string_link(shape, shapes_path)}')
+    return '\n'.join(lines)
+
+
+def get_example_paginator_snippet(paginator, name, client_name, service, fn_name, service_path):
+    output_token = as_list(paginator['output_token'])[0]
     return f"""```python
 import boto3
 
 client = boto3.client('{client_name}')
 paginator = client.get_paginator('{fn_name}')  # type: botostubs.{service}.{name}Paginator
 response_iterator = paginator.paginate(
-    PaginationConfig={{'MaxItems': 123, 'PageSize': 123, 'StartingToken': previous_response.get('{paginator["output_token"]}')}}, OtherParams=...
+    PaginationConfig={{'MaxItems': 123, 'PageSize': 123, 'StartingToken': previous_response.get('{output_token}')}}, OtherParams=...
 )
 ```
 {get_botostubs_message()}
@@ -47,27 +83,44 @@ _See {client_name}_client.[{fn_name}]({service_path}/client/operations/{fn_name}
 """
 
 
-def get_paginator_page(name, pythonic_name, client_name, class_name, paginator, paginator_path, service_path):
+def get_paginator_page(
+    name, pythonic_name, client_name, class_name, paginator, paginator_path, service_path, output_shape
+):
     headline = f'# {pythonic_name} paginator'
+    shapes_path = f'{service_path}/data-types.md'
     signature = f"""
 
 {get_example_paginator_snippet(paginator, name, client_name, class_name, pythonic_name, service_path)}
+### Pagination config
+{get_pagination_config_string(paginator)}
+
+### Result items
+The items of every page are aggregated from:
+{get_result_items_string(paginator, output_shape, shapes_path)}
 """
     documentation = f'Creates an iterator that will paginate through responses from {client_name}_client.{get_link_to_client_function(pythonic_name, service_path)}'
     list_item = f'- [{pythonic_name}]({paginator_path})'
     return list_item, signature, documentation, headline
 
 
-def handle_paginators(client_name, class_name, service_name, service_path, sidebar_lines):
+def get_paginator_config(client):
+    # loaded through the client's own loader so that the service's models are only parsed once
+    from botocore.exceptions import DataNotFoundError
+
+    service_model = client._service_model
     try:
-        model = botocore.session.get_session().get_paginator_model(client_name)
-    except botocore.exceptions.UnknownServiceError:
-        return
+        model = client._loader.load_service_model(service_model.service_name, 'paginators-1', service_model.api_version)
+    except DataNotFoundError:
+        return {}
+    return model['pagination']
+
 
-    paginator_config = model._paginator_config
+def handle_paginators(
+    paginator_config, output_shapes, client_name, class_name, service_name, service_path, sidebar_lines
+):
     if not paginator_config:
         return
-    paginator_names = list(paginator_config.keys())
+    paginator_names = sorted(paginator_config)
     if not paginator_names:
         return
     paginators_path = f'{service_path}/paginators'
@@ -82,8 +135,10 @@ def handle_paginators(client_name, class_name, service_name, service_path, sideb
         paginator_path = f'{paginators_path}/{pythonic_name}'
         docs_pagination_path = f'docs/{paginator_path}.md'
         create_new_file(docs_pagination_path)
+        # paginators are keyed by the name of the operation they paginate
+        output_shape = output_shapes.get(name)
         list_item, signature, documentation, headline = get_paginator_page(
-            name, pythonic_name, client_name, class_name, paginator, paginator_path, service_path
+            name, pythonic_name, client_name, class_name, paginator, paginator_path, service_path, output_shape
         )
         create_new_file(docs_pagination_path)
         write_lines(docs_pagination_path, [headline, documentation, signature])
@@ -0,0 +1,62 @@
+import os
+import sys
+
+# set by main.py --workers; 1 renders everything in the calling process
+worker_count = 1
+# below this many items, forking the workers costs more than rendering the items serially
+min_parallel_items = 64
+# the workers are forked so that they inherit the models; Windows has no fork, and macOS system libraries are not safe
+# to use in a forked child
+can_fork = sys.platform.startswith('linux')
+_render = None
+_items = []
+_owner = None
+# in a worker, the cache entries it added while rendering, sent back to the caller along with the results
+_new_cache_entries = None
+_cache_merges = {}
+
+
+def register_cache(name, merge):
+    # merge(owner, key, value) adds an entry a worker created to the cache of the calling process
+    _cache_merges[name] = merge
+
+
+def record_cache_entry(name, owner, key, value):
+    # owner is what the cache is kept per, like the shape resolver of a service, or None for a cache of its own
+    if _new_cache_entries is not None and (owner is None or owner is _owner):
+        _new_cache_entries.append((name, key, value))
+
+
+def render_item(index):
+    global _new_cache_entries
+    _new_cache_entries = []
+    try:
+        return _render(_items[index]), _new_cache_entries
+    finally:
+        _new_cache_entries = None
+
+
+def render_in_order(render, items, owner=None):
+    # processes rather than threads: rendering is pure python string building, which threads would serialise on the GIL
+    global _render, _items, _owner
+    items = list(items)
+    if worker_count <= 1 or not can_fork or len(items) < min_parallel_items:
+        return [render(item) for item in items]
+    # the render function, and the models it closes over, are inherited by the forked workers instead of being
+    # pickled; only indices, the rendered results and new cache entries cross the process boundary, in order
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    _render, _items, _owner = render, items, owner
+    try:
+        with ProcessPoolExecutor(worker_count, mp_context=get_context('fork')) as executor:
+            chunksize = max(1, len(items) // (worker_count * 4))
+            results = []
+            for result, cache_entries in executor.map(render_item, range(len(items)), chunksize=chunksize):
+                results.append(result)
+                # the workers' caches go away with them, so the rest of the build would compute these entries again
+                for name, key, value in cache_entries:
+                    _cache_merges[name](owner, key, value)
+            return results
+    finally:
+        _render, _items, _owner = None, [], None
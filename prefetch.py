@@ -0,0 +1,91 @@
+import argparse
+import json
+
+from links import find_pages, get_page_name, get_service_of, is_external, read_page, resolve_link
+
+prefetch_manifest_name = 'prefetch.json'
+link_graph_name = 'link-graph.json'
+# how many of the pages a page links to are worth fetching ahead of a click
+max_prefetched_pages = 4
+
+
+def build_link_graph(docs_path='docs', workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    paths = sorted(find_pages(docs_path))
+    pages = [get_page_name(path, docs_path) for path in paths]
+    with ProcessPoolExecutor(workers, mp_context=get_context('fork')) as executor:
+        results = list(executor.map(read_page, paths, chunksize=64))
+    page_names = set(pages)
+    graph = {}
+    for page, (_, links) in zip(pages, results):
+        # how many times the page links to each of the other pages
+        link_counts = {}
+        for link in links:
+            if is_external(link):
+                continue
+            target, _ = resolve_link(link)
+            if target not in page_names:
+                target = f'{target}/README'
+                if target not in page_names:
+                    continue
+            if target != page:
+                link_counts[target] = link_counts.get(target, 0) + 1
+        graph[page] = link_counts
+    return graph
+
+
+def get_prefetch_targets(graph):
+    linked_from_counts = {}
+    for link_counts in graph.values():
+        for target in link_counts:
+            linked_from_counts[target] = linked_from_counts.get(target, 0) + 1
+    # the likeliest next pages: those the page links to the most, then those the whole site links to the most
+    return {
+        page: sorted(link_counts, key=lambda x: (-link_counts[x], -linked_from_counts[x], x))[:max_prefetched_pages]
+        for page, link_counts in graph.items()
+        # _sidebar and the like are not pages that get navigated to
+        if link_counts and not page.startswith('_')
+    }
+
+
+def get_manifest_path(service):
+    # one manifest per service keeps what the browser downloads small; docs/index.html looks them up the same way
+    return prefetch_manifest_name if service == '(site)' else f'services/{service}/{prefetch_manifest_name}'
+
+
+def write_prefetch_manifests(docs_path='docs', graph=None):
+    if graph is None:
+        graph = build_link_graph(docs_path)
+    targets_per_service = {}
+    for page, targets in sorted(get_prefetch_targets(graph).items()):
+        targets_per_service.setdefault(get_service_of(page), {})[page] = targets
+    for service, targets in targets_per_service.items():
+        with open(f'{docs_path}/{get_manifest_path(service)}', 'w') as f:
+            json.dump(targets, f, separators=(',', ':'), sort_keys=True)
+    return len(targets_per_service)
+
+
+def write_link_graph(path, graph):
+    with open(path, 'w') as f:
+        json.dump(graph, f, separators=(',', ':'), sort_keys=True)
+
+
+def write_prefetch_files(docs_path='docs'):
+    # the graph too, next to the manifests, for whoever wants to look into how the pages link to each other
+    graph = build_link_graph(docs_path)
+    write_link_graph(f'{docs_path}/{link_graph_name}', graph)
+    return write_prefetch_manifests(docs_path, graph)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Writes the prefetch manifests that docs/index.html reads')
+    parser.add_argument('docs_path', nargs='?', default='docs')
+    parser.add_argument('--graph', metavar='PATH', help='also write how many times every page links to the others')
+    args = parser.parse_args()
+    link_graph = build_link_graph(args.docs_path)
+    if args.graph:
+        write_link_graph(args.graph, link_graph)
+    manifest_count = write_prefetch_manifests(args.docs_path, link_graph)
+    print(f'wrote {manifest_count} prefetch manifests for {len(link_graph)} pages')
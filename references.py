@@ -0,0 +1,67 @@
+import pythonic
+
+
+def get_member_shapes(shape):
+    if hasattr(shape, 'member'):
+        return [shape.member]
+    if hasattr(shape, 'members'):
+        return list(shape.members.values())
+    if shape.type_name == 'map':
+        return [shape.key, shape.value]
+    return []
+
+
+def build_reference_index(service_model, resource_graph, service_path):
+    # one pass over the model: every edge is recorded once against the shape it points to
+    index = {}
+    shapes_path = f'{service_path}/data-types.md'
+
+    def add(shape_name, reference):
+        index.setdefault(shape_name, {})[reference] = None
+
+    for name in sorted(service_model.shape_names):
+        for member in get_member_shapes(service_model.shape_for(name)):
+            add(member.name, f'[{name}]({shapes_path}#{name})')
+
+    operation_shapes = {}
+    for operation_name in sorted(service_model.operation_names):
+        operation_model = service_model.operation_model(operation_name)
+        fn_name = pythonic.xform_name(operation_name)
+        link = f'[{fn_name}]({service_path}/client/operations/{fn_name})'
+        shape_names = []
+        if operation_model.input_shape:
+            add(operation_model.input_shape.name, f'{link} (accepts)')
+            shape_names.append(operation_model.input_shape.name)
+        if operation_model.output_shape:
+            add(operation_model.output_shape.name, f'{link} (returns)')
+            shape_names.append(operation_model.output_shape.name)
+        operation_shapes[operation_name] = shape_names
+
+    for reference, operation_name in get_resource_references(resource_graph):
+        for shape_name in operation_shapes.get(operation_name, []):
+            add(shape_name, reference)
+    return {name: list(references) for name, references in index.items()}
+
+
+def get_resource_references(resource_graph):
+    for node in resource_graph.values():
+        label = node['model'].name if node['parent'] else 'resource'
+        yield from get_resource_model_references(node['model'], node['path'], label)
+
+
+def get_resource_model_references(resource_model, resource_path, label):
+    for action in resource_model.actions:
+        if action.request:
+            link = f'[{label}.{action.name}]({resource_path}/operations/{action.name})'
+            yield f'{link} (action)', action.request.operation
+    for collection in resource_model.collections:
+        if collection.request:
+            link = f'[{label}.{collection.name}]({resource_path}/collections/{collection.name})'
+            yield f'{link} (collection)', collection.request.operation
+
+
+def get_used_by_string(shape_name, references):
+    used_by = references.get(shape_name) if references else None
+    if not used_by:
+        return ''
+    return f'_Used by: {", ".join(used_by)}_\n\n'
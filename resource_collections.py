@@ -1,13 +1,18 @@
-from boto3.resources.model import Collection, Action
-from botocore.model import OperationModel
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 import pythonic
 from clients import get_parameter_declaration_with
-from util import create_new_file, get_accepts_redirect_link, get_botostubs_message, get_resource_path_for, write_lines
+from util import create_new_file, get_accepts_redirect_link, get_botostubs_message, write_lines
+
+if TYPE_CHECKING:
+    from boto3.resources.model import Collection, Action
+    from botocore.model import OperationModel
 
 
 def create_collection_page(
-    path, collection_name, resource_name, class_name, parameter_str, client_name, service_path, op_name, resource_path
+    path, collection_name, resource_name, class_name, parameter_str, client_name, service_path, op_name, resource_paths
 ):
     create_new_file(path)
 
@@ -29,7 +34,7 @@ def create_collection_page(
             'count=123',
         )
 
-    new_resource_path = get_resource_path_for(resource_name, resource_path)
+    new_resource_path = resource_paths[resource_name]
     result = [
         f'# {collection_name} collection',
         f'A collection of [{resource_name}]({new_resource_path}) resources:\n',
@@ -59,8 +64,38 @@ for {item_name} in resource.{collection_name}.{fn.__name__}({param_str}):
     return result
 
 
+def create_collection_stub_page(path, collection_name, resource_name, resource_paths, canonical_name, canonical_path):
+    create_new_file(path)
+    item_name = pythonic.xform_name(resource_name)
+    new_resource_path = resource_paths[resource_name]
+    return [
+        f'# {collection_name} collection',
+        f'A collection of [{resource_name}]({new_resource_path}) resources:\n',
+        f"""```python
+for {item_name} in resource.{collection_name}.all():
+    pass # TODO: add your code here
+```
+""",
+        f'This collection works exactly like the [{canonical_name}]({canonical_path}) collection: see it for all the available methods and batch actions.',
+    ]
+
+
+def get_collection_key(collection):
+    # collections over the same resource type, backed by the same operation, render the same page
+    batch_action_names = tuple(action.name for action in collection.batch_actions)
+    return collection.resource.model.name, collection.request.operation, batch_action_names
+
+
 def handle_collections(
-    collections, resource_list_items, resource_path, class_name, service_model, client_name, service_path
+    collections,
+    resource_list_items,
+    resource_path,
+    class_name,
+    service_model,
+    client_name,
+    service_path,
+    canonical_collections,
+    resource_paths,
 ):
     if collections:
         resource_list_items.extend(['# Collections', 'These are the available collections:'])
@@ -72,6 +107,15 @@ def handle_collections(
         list_item = f'-  **[{name}]({collection_path})**'
         resource_list_items.append(list_item)
         resource_name = collection.resource.model.name
+        key = get_collection_key(collection)
+        if key in canonical_collections:
+            canonical_name, canonical_path = canonical_collections[key]
+            collection_list_items = create_collection_stub_page(
+                docs_collection_path, name, resource_name, resource_paths, canonical_name, canonical_path
+            )
+            write_lines(docs_collection_path, collection_list_items)
+            continue
+        canonical_collections[key] = name, collection_path
 
         op_name = collection.request.operation
         param_str = get_param_str_from_operation(op_name, service_model)
@@ -85,7 +129,7 @@ def handle_collections(
             client_name,
             service_path,
             op_name,
-            resource_path,
+            resource_paths,
         )
 
         handle_batch_actions(client_name, collection, collection_list_items, service_path)
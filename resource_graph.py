@@ -0,0 +1,93 @@
+from collections import deque
+
+import pythonic
+from util import get_variable_name_for
+
+
+def build_resource_graph(resource_model, resource_path):
+    # walks the whole resource model once, breadth first. Every resource type gets a single node and canonical path,
+    # however many resources expose it; types already seen (shared types and cycles) are not walked again.
+    if not resource_model:
+        return {}
+    root = new_node(resource_model, resource_path, None, None)
+    graph = {resource_model.name: root}
+    used_paths = {resource_path}
+    queue = deque([root])
+
+    def add_edge(node, kind, name, target_model, params=''):
+        node['edges'].append((kind, name, target_model.name))
+        if target_model.name in graph:
+            return
+        # the sub-resources of the service resource keep the pages they always had, named after the attribute (EC2's
+        # KeyPair holds KeyPairInfo); the other types are named after themselves, numbered if that name is taken
+        page_name = name if kind == 'sub-resource' and node is root else target_model.name
+        target_path = f'{resource_path}/sub-resources/{page_name}'
+        suffix = 1
+        while target_path in used_paths:
+            suffix += 1
+            target_path = f'{resource_path}/sub-resources/{page_name}-{suffix}'
+        used_paths.add(target_path)
+        target = new_node(target_model, target_path, node, (kind, name, params))
+        graph[target_model.name] = target
+        queue.append(target)
+
+    while queue:
+        node = queue.popleft()
+        model = node['model']
+        for sub_resource in model.subresources:
+            add_edge(node, 'sub-resource', sub_resource.name, sub_resource.resource.model, get_params(sub_resource))
+        # resources that this one points to through its data, like the Vpc of an EC2 Instance
+        for reference in model.references:
+            plural = '[]' in (reference.resource.path or '')
+            add_edge(node, 'reference', reference.name, reference.resource.model, '[0]' if plural else '')
+        # types that are only returned by actions or collections still need a page to link to
+        for action in model.actions:
+            if action.resource:
+                add_edge(node, 'action', action.name, action.resource.model)
+        for collection in model.collections:
+            add_edge(node, 'collection', collection.name, collection.resource.model)
+    return graph
+
+
+def new_node(model, path, parent, via):
+    return {
+        'model': model,
+        'path': path,
+        'depth': parent['depth'] + 1 if parent else 0,
+        'parent': parent['model'].name if parent else None,
+        'via': via,
+        'variable': get_variable_name_for(model.name) if parent else 'resource',
+        'edges': [],
+    }
+
+
+def get_params(sub_resource):
+    return ', '.join(
+        pythonic.xform_name(identifier.target) + "='...'" for identifier in sub_resource.resource.identifiers
+    )
+
+
+def get_resource_paths(graph):
+    return {name: node['path'] for name, node in graph.items()}
+
+
+def get_sub_resource_nodes(graph):
+    return [node for node in graph.values() if node['parent']]
+
+
+def get_creation_lines(graph, node):
+    lines = []
+    while node['parent']:
+        parent = graph[node['parent']]
+        kind, name, params = node['via']
+        variable, parent_variable = node['variable'], parent['variable']
+        if kind == 'sub-resource':
+            lines.append(f'{variable} = {parent_variable}.{name}({params})')
+        elif kind == 'reference':
+            lines.append(f'{variable} = {parent_variable}.{name}{params}')
+        elif kind == 'action':
+            lines.append(f'{variable} = {parent_variable}.{name}(...)')
+        else:
+            lines.append(f'{variable} = next(iter({parent_variable}.{name}.all()))')
+        node = parent
+    return list(reversed(lines))
@@ -1,13 +1,12 @@
-from typing import List
+from __future__ import annotations
 
-import boto3
-from boto3.resources.base import ServiceResource
-from boto3.resources.model import Parameter
-from botocore.model import ServiceModel
+from typing import TYPE_CHECKING, List
 
-import pythonic
 from clients import get_parameter_declaration_with, get_param_str, get_param_str_params
+from examples import get_example_imports
+from parallel import render_in_order
 from resource_collections import handle_collections
+from resource_graph import get_creation_lines, get_resource_paths, get_sub_resource_nodes
 from util import (
     write_lines,
     create_new_file,
@@ -15,71 +14,94 @@ from util import (
     get_returns_string,
     get_operation_documentation,
     get_accepts_string_members,
-    get_resource_path_for,
-    is_sub_resource,
-    get_variable_name_for,
+    get_shape_href,
 )
-
-try:
-    import botostubs
-except:
-    pass
-
 from waiters import handle_sub_resource_waiters
 
+if TYPE_CHECKING:
+    from boto3.resources.base import ServiceResource
+    from boto3.resources.model import Parameter
+    from botocore.model import ServiceModel
+
 
 def handle_sub_resource(
     resource_name,
-    sub_resource,
+    node,
+    resource_graph,
     sidebar_lines,
-    resource_path,
-    resource_list_items,
     class_name,
     service_model,
     shapes_path,
     service_path,
+    waiters,
+    canonical_collections,
+    resource_paths,
 ):
-    sub_resource_name = sub_resource.name
-    sub_resource_path = f'{resource_path}/sub-resources/{sub_resource_name}'
+    sub_resource_model = node['model']
+    sub_resource_name = sub_resource_model.name
+    sub_resource_path = node['path']
     docs_sub_resource_path = f'docs/{sub_resource_path}.md'
-    list_item = f'-  **[{sub_resource_name}]({sub_resource_path})**'
-    resource_list_items.append(list_item)
     sidebar_lines.append(f'          - [{sub_resource_name} sub-resource]({sub_resource_path})')
 
-    param_str = get_sub_resource_param_str(sub_resource)
-    sub_resource_shape_name = sub_resource.resource.model.shape
     sub_resource_list_items = create_sub_resource_index(
         docs_sub_resource_path,
         resource_name,
         class_name,
         sub_resource_name,
-        param_str,
-        sub_resource_shape_name,
+        get_creation_lines(resource_graph, node),
+        sub_resource_model.shape,
         shapes_path,
     )
-    actions = sub_resource.resource.model.actions
+    actions = sub_resource_model.actions
     handle_resource_actions(
-        resource_name, class_name, sub_resource_list_items, sub_resource_path, service_model, shapes_path, actions
+        resource_name,
+        class_name,
+        sub_resource_list_items,
+        sub_resource_path,
+        service_model,
+        shapes_path,
+        actions,
+        resource_paths,
+        node['variable'],
     )
-    collections = sub_resource.resource.model.collections
+    collections = sub_resource_model.collections
     handle_collections(
-        collections, sub_resource_list_items, sub_resource_path, class_name, service_model, resource_name, service_path
+        collections,
+        sub_resource_list_items,
+        sub_resource_path,
+        class_name,
+        service_model,
+        resource_name,
+        service_path,
+        canonical_collections,
+        resource_paths,
     )
-    handle_sub_resource_waiters(sub_resource, sub_resource_list_items, service_path)
+    handle_sub_resource_waiters(sub_resource_model, sub_resource_list_items, service_path, waiters)
+    handle_sub_resource_list(node, sub_resource_list_items, resource_paths)
 
     write_lines(docs_sub_resource_path, sub_resource_list_items)
 
 
-def get_sub_resource_param_str(sub_resource):
-    params = []
-    for identifier in sub_resource.resource.identifiers:
-        params.append(pythonic.xform_name(identifier.target) + "='...'")
-    param_str = ', '.join(params)
-    return param_str
+def handle_sub_resource_list(node, list_items, resource_paths):
+    sub_resources = [(name, target) for kind, name, target in node['edges'] if kind == 'sub-resource']
+    if sub_resources:
+        list_items.append('\n')
+        list_items.append('# Sub-resources')
+        list_items.append('These are the available sub-resources:')
+    for name, target in sub_resources:
+        list_items.append(f'-  **[{name}]({resource_paths[target]})**')
 
 
 def handle_resource_action(
-    client_name, class_name, action, method_path, fn_name, service_model: ServiceModel, shapes_path, resource_path
+    client_name,
+    class_name,
+    action,
+    method_path,
+    fn_name,
+    service_model: ServiceModel,
+    shapes_path,
+    resource_paths,
+    sub_res_var_name,
 ):
     operation_model = service_model.operation_model(action.request.operation)
     input_shape = operation_model.input_shape
@@ -89,17 +111,13 @@ def handle_resource_action(
 
     output_name = action.resource.model.name if action.resource else None
     if output_name:
-        new_path = get_resource_path_for(output_name, resource_path)
+        new_path = resource_paths[output_name]
         append_return_type = ' -> ' + f'[{output_name}]({new_path})'
     else:
         append_return_type = ''
 
-    sub_res_var_name = None
-    is_sub_res = is_sub_resource(resource_path)
     parameters = input_shape.members if input_shape else {}
-    if is_sub_res:
-        sub_res_name = resource_path[resource_path.rindex('/') + 1 :]
-        sub_res_var_name = get_variable_name_for(sub_res_name)
+    if sub_res_var_name:
         request_params = list(map(lambda x: x.target, action.request.params))
         if input_shape:
             include_params = {name: value for name, value in input_shape.members.items() if name not in request_params}
@@ -140,7 +158,7 @@ def get_example_resource_snippet(client_name, service, fn_name, parameters, requ
     param_str = get_parameter_declaration_with(parameters, required_members)
     return f"""## Example snippet
 ```python
-import boto3
+{get_example_imports(param_str)}import boto3
 
 resource = boto3.resource('{client_name}')  # type: botostubs.{service}.{service}Resource
 result = resource.{fn_name}({param_str}){result_type_hint}
@@ -154,7 +172,7 @@ def get_example_sub_resource_snippet(variable_name, service, fn_name, parameters
     param_str = get_parameter_declaration_with(parameters, required_members)
     return f"""## Example snippet
 ```python
-result = {variable_name}.{fn_name}({param_str}){result_type_hint}
+{get_example_imports(param_str)}result = {variable_name}.{fn_name}({param_str}){result_type_hint}
 ```
 {get_botostubs_message()}"""
 
@@ -191,19 +209,40 @@ def get_signature_string(
 {get_returns_string(output_shape, shapes_path)}"""
 
 
-def handle_resource_actions(client_name, class_name, list_items, resource_path, service_model, shapes_path, actions):
+def handle_resource_actions(
+    client_name,
+    class_name,
+    list_items,
+    resource_path,
+    service_model,
+    shapes_path,
+    actions,
+    resource_paths,
+    sub_res_var_name=None,
+):
     if actions:
         list_items.extend(['# Actions', 'These are the available actions:'])
-    for action in actions:
+
+    def render_action(action):
         fn_name = action.name
         method_path = f'{resource_path}/operations/{fn_name}.md'
         list_item, signature, documentation, headline = handle_resource_action(
-            client_name, class_name, action, method_path, fn_name, service_model, shapes_path, resource_path
+            client_name,
+            class_name,
+            action,
+            method_path,
+            fn_name,
+            service_model,
+            shapes_path,
+            resource_paths,
+            sub_res_var_name,
         )
         docs_method_path = f'docs/{method_path}'
         create_new_file(docs_method_path)
         write_lines(docs_method_path, [headline, documentation, signature])
-        list_items.append(list_item)
+        return list_item
+
+    list_items.extend(render_in_order(render_action, actions, service_model._shape_resolver))
     if actions:
         list_items.append('')  # newline
 
@@ -227,19 +266,17 @@ resource = boto3.resource('{resource_name}')  # type: botostubs.{class_name}.{cl
 def get_resource_equivalence_message(name, shape_name, path):
     if not shape_name:
         return ''
-    suffix = f'[{shape_name}]({path}#{shape_name})_\n'
+    suffix = f'[{shape_name}]({get_shape_href(shape_name, path)})_\n'
     if name != shape_name:
         return f'_{name} has its attributes detailed in {suffix}'
     return f'_{suffix} specs'
 
 
 def create_sub_resource_index(
-    path, resource_name, class_name, sub_resource_name, param_str, sub_resource_shape_name, shapes_path
+    path, resource_name, class_name, sub_resource_name, creation_lines, sub_resource_shape_name, shapes_path
 ):
     create_new_file(path)
-    sub_resource_variable = pythonic.xform_name(sub_resource_name)
-    if '_' in sub_resource_variable:
-        sub_resource_variable = sub_resource_variable[sub_resource_variable.rindex('_') + 1 :]
+    creation_str = '\n'.join(creation_lines)
     resource_hint = f"botostubs.{class_name}.{class_name}Resource"
     sub_resource_title = f'{class_name}.{sub_resource_name}'
     return [
@@ -250,7 +287,7 @@ def create_sub_resource_index(
 import boto3
 
 resource = boto3.resource('{resource_name}')  # type: {resource_hint}
-{sub_resource_variable} = resource.{sub_resource_name}({param_str})  # type: {resource_hint}.{sub_resource_name}
+{creation_str}  # type: {resource_hint}.{sub_resource_name}
 ```
 """,
         get_resource_equivalence_message(sub_resource_name, sub_resource_shape_name, shapes_path),
@@ -262,10 +299,27 @@ def get_collection_parameter_declaration(parameters: List[Parameter]):
     return ', '.join(map(lambda x: x.value, parameters))
 
 
-def handle_resources(client, resource_name, class_name, service_name, service_path, sidebar_lines):
+def get_service_resource(resource_name, session=None):
+    import boto3
+
     try:
-        resource: ServiceResource = boto3.resource(resource_name)
+        return (session or boto3).resource(resource_name)
     except boto3.exceptions.ResourceNotExistsError:
+        return None
+
+
+def handle_resources(
+    client,
+    resource: ServiceResource,
+    resource_name,
+    class_name,
+    service_name,
+    service_path,
+    sidebar_lines,
+    waiters,
+    resource_graph,
+):
+    if not resource:
         return
     service_model: ServiceModel = client._service_model
     service_id = service_model.service_id
@@ -276,31 +330,46 @@ def handle_resources(client, resource_name, class_name, service_name, service_pa
     docs_resource_path = f'docs/{resource_path}.md'
     resource_list_items = create_resource_index(docs_resource_path, resource_name, service_name, class_name)
     resource_model = resource.meta.resource_model
+    resource_paths = get_resource_paths(resource_graph)
     actions = resource_model.actions
     handle_resource_actions(
-        resource_name, class_name, resource_list_items, resource_path, service_model, shapes_path, actions
+        resource_name,
+        class_name,
+        resource_list_items,
+        resource_path,
+        service_model,
+        shapes_path,
+        actions,
+        resource_paths,
     )
 
     collections = resource_model.collections
+    canonical_collections = {}
     handle_collections(
-        collections, resource_list_items, resource_path, class_name, service_model, resource_name, service_path
+        collections,
+        resource_list_items,
+        resource_path,
+        class_name,
+        service_model,
+        resource_name,
+        service_path,
+        canonical_collections,
+        resource_paths,
     )
-    sub_resources = resource_model.subresources
-    if sub_resources:
-        resource_list_items.append('\n')
-        resource_list_items.append('# Sub-resources')
-        resource_list_items.append('These are the available sub-resources:')
-    for sub_resource in sub_resources:
+    handle_sub_resource_list(resource_graph[resource_model.name], resource_list_items, resource_paths)
+    for node in get_sub_resource_nodes(resource_graph):
         handle_sub_resource(
             resource_name,
-            sub_resource,
+            node,
+            resource_graph,
             sidebar_lines,
-            resource_path,
-            resource_list_items,
             class_name,
             service_model,
             shapes_path,
             service_path,
+            waiters,
+            canonical_collections,
+            resource_paths,
         )
 
     write_lines(docs_resource_path, resource_list_items)
@@ -0,0 +1,90 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+
+shards_path = '.shards'
+shard_regex = re.compile(r'^(\d+)/(\d+)$')
+
+
+def parse_shard(spec):
+    match = shard_regex.match(spec)
+    if not match or not 1 <= int(match[1]) <= int(match[2]):
+        raise argparse.ArgumentTypeError(f'expected a shard like 2/4, with 1 <= shard <= shard count, got {spec}')
+    return int(match[1]), int(match[2])
+
+
+def get_service_costs(client_names):
+    import botocore.session
+
+    # a throwaway loader: only the size of the models matters here, not the models themselves
+    loader = botocore.session.get_session().get_component('data_loader')
+    costs = {}
+    for client_name in client_names:
+        model = loader.load_service_model(client_name, 'service-2')
+        costs[client_name] = len(model.get('operations', {})) + len(model.get('shapes', {}))
+    return costs
+
+
+def partition_services(costs, shard_count):
+    # longest processing time first: the most expensive remaining service goes to the least loaded shard. Names break
+    # the ties so that every shard computes the same partition on its own
+    loads = [0] * shard_count
+    partitions = [[] for _ in range(shard_count)]
+    for client_name in sorted(costs, key=lambda x: (-costs[x], x)):
+        shard_index = loads.index(min(loads))
+        loads[shard_index] += costs[client_name]
+        partitions[shard_index].append(client_name)
+    return [sorted(partition) for partition in partitions]
+
+
+def get_shard_services(client_names, shard):
+    index, count = shard
+    return partition_services(get_service_costs(client_names), count)[index - 1]
+
+
+def get_fragments_path(shard):
+    index, count = shard
+    return f'{shards_path}/shard-{index}-of-{count}.json'
+
+
+def get_build_id(timestamp, client_names):
+    # the same for every shard of a build, and for the merge of it, given the same --timestamp and --services
+    services_hash = hashlib.sha256(json.dumps(sorted(client_names)).encode()).hexdigest()[:16]
+    return f'{timestamp}-{services_hash}'
+
+
+def write_shard_fragments(shard, fragments, failures, build_id):
+    os.makedirs(shards_path, exist_ok=True)
+    path = get_fragments_path(shard)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump({'build': build_id, 'shard': list(shard), 'services': fragments, 'failures': sorted(failures)}, f)
+    os.replace(f'{path}.tmp', path)
+
+
+def read_shard_fragments(build_id):
+    shard_files = sorted(name for name in os.listdir(shards_path) if name.endswith('.json'))
+    shards = []
+    for file_name in shard_files:
+        with open(f'{shards_path}/{file_name}') as f:
+            shards.append(json.load(f))
+    # fragments left over from another build would otherwise be merged into this one's index pages
+    other_builds = sorted(name for name, shard in zip(shard_files, shards) if shard.get('build') != build_id)
+    if other_builds:
+        raise ValueError(
+            f'{", ".join(other_builds)} in {shards_path} come from another build than {build_id}: rerun their shards, '
+            'or merge with the --timestamp and --services of their build'
+        )
+    counts = {shard['shard'][1] for shard in shards}
+    if len(counts) != 1:
+        raise ValueError(f'the {shards_path} folder mixes builds with different shard counts: {sorted(counts)}')
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {shard['shard'][0] for shard in shards})
+    if missing:
+        raise ValueError(f'missing the fragments of shards {", ".join(map(str, missing))} of {count}')
+    fragments, failures = {}, []
+    for shard in shards:
+        fragments.update(shard['services'])
+        failures.extend(shard['failures'])
+    return fragments, failures
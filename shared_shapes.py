@@ -0,0 +1,76 @@
+import json
+from hashlib import blake2b
+
+shared_shapes_path = 'services/shared/data-types.md'
+shared_shape_types = ('structure', 'list', 'map')
+# filled by build_shared_shapes before the services are rendered; empty, every service documents all of its shapes
+_shared_anchors = {}
+_shared_shapes = {}
+
+
+def get_shape_hashes(shapes):
+    # a hash of everything that ends up on the page: name, type, documentation, enum and, recursively, the members
+    hashes = {}
+
+    def hash_shape(name, parent_names):
+        if name in hashes:
+            return hashes[name]
+        if name in parent_names:
+            return f'cycle:{name}'
+        shape = shapes[name]
+        references = {key: shape[key] for key in ['member', 'key', 'value'] if key in shape}
+        references.update(
+            {f'members.{member_name}': member for member_name, member in shape.get('members', {}).items()}
+        )
+        digest = blake2b(digest_size=16)
+        properties = {key: value for key, value in shape.items() if key not in ['member', 'key', 'value', 'members']}
+        digest.update(json.dumps([name, properties], sort_keys=True).encode())
+        for key, reference in sorted(references.items()):
+            reference_properties = {k: v for k, v in reference.items() if k != 'shape'}
+            member_hash = hash_shape(reference['shape'], parent_names + [name])
+            digest.update(json.dumps([key, member_hash, reference_properties], sort_keys=True).encode())
+        hashes[name] = digest.hexdigest()
+        return hashes[name]
+
+    for shape_name in sorted(shapes):
+        hash_shape(shape_name, [])
+    return hashes
+
+
+def is_worth_sharing(shape):
+    # an empty structure takes less room than the link to the shared page would
+    return shape['type'] in shared_shape_types and bool(shape.get('members') or 'member' in shape or 'key' in shape)
+
+
+def build_shared_shapes(client_names):
+    import botocore.session
+
+    _shared_anchors.clear()
+    _shared_shapes.clear()
+    # raw models from a throwaway loader: nothing is kept but the hashes
+    loader = botocore.session.get_session().get_component('data_loader')
+    services_per_shape = {}
+    for client_name in client_names:
+        model = loader.load_service_model(client_name, 'service-2')
+        shapes_path = f'services/{model["metadata"]["endpointPrefix"]}/data-types.md'
+        for name, shape_hash in get_shape_hashes(model['shapes']).items():
+            if is_worth_sharing(model['shapes'][name]):
+                services_per_shape.setdefault((name, shape_hash), []).append((client_name, shapes_path))
+    # two clients can write the same data types page: they do not make a shape shared
+    shared = {key: services for key, services in services_per_shape.items() if len({path for _, path in services}) > 1}
+    names = [name for name, _ in shared]
+    for (name, shape_hash), services in sorted(shared.items()):
+        # the name alone is the anchor, unless several shared shapes have that name
+        anchor = name if names.count(name) == 1 else f'{name}-{shape_hash[:8]}'
+        _shared_shapes[anchor] = (name, services)
+        for _, shapes_path in services:
+            _shared_anchors.setdefault(shapes_path, {})[name] = anchor
+    return len(_shared_shapes)
+
+
+def get_shared_anchor(shapes_path, shape_name):
+    return _shared_anchors.get(shapes_path, {}).get(shape_name)
+
+
+def get_shared_shapes():
+    return _shared_shapes
@@ -0,0 +1,34 @@
+import html_docs
+from html_docs import html_to_markdown
+
+
+def test_inline_code():
+    assert html_to_markdown('<p>Call <code>list_queues</code> first</p>') == 'Call `list_queues` first'
+
+
+def test_code_block():
+    html = '<p>For example:</p><pre><code>a = 1\n  b = 2</code></pre><p>Done</p>'
+    assert html_to_markdown(html) == 'For example:\n\n```\na = 1\n  b = 2\n```\n\nDone'
+
+
+def test_code_block_in_list_item():
+    html = '<ul><li><p>Example:</p><pre><code>a = 1\n  b = 2</code></pre></li></ul>'
+    assert html_to_markdown(html) == '- Example:\n\n  ```\n  a = 1\n    b = 2\n  ```'
+
+
+def test_paragraphs_in_list_items():
+    html = '<ul><li><p>One</p></li><li><p>Two</p><p>More about two</p></li></ul>'
+    assert html_to_markdown(html) == '- One\n- Two\n\n  More about two'
+
+
+def test_note_in_nested_list_item():
+    html = '<ol><li><p>First</p><ul><li><p>Inner</p><note><p>Careful</p></note></li></ul></li></ol>'
+    assert html_to_markdown(html) == '1. First\n\n   - Inner\n\n     **Note:** Careful'
+
+
+def test_markdown_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(html_docs, 'max_markdown_cache_entries', 2)
+    html_docs.clear_markdown_cache()
+    for word in ['one', 'two', 'three']:
+        assert html_to_markdown(f'<p>{word}</p>') == word
+    assert list(html_docs._markdown_cache) == ['<p>two</p>', '<p>three</p>']
@@ -0,0 +1,25 @@
+import pytest
+
+import html_docs
+import parallel
+from html_docs import html_to_markdown
+
+
+@pytest.mark.skipif(not parallel.can_fork, reason='the workers are only forked on Linux')
+def test_cache_entries_of_workers_are_kept(monkeypatch):
+    monkeypatch.setattr(parallel, 'worker_count', 2)
+    monkeypatch.setattr(parallel, 'min_parallel_items', 1)
+    html_docs.clear_markdown_cache()
+    pages = [f'<p>Page {index}</p>' for index in range(8)]
+
+    assert parallel.render_in_order(html_to_markdown, pages) == [f'Page {index}' for index in range(8)]
+
+    conversions = []
+    feed = html_docs.MarkdownConverter.feed
+    monkeypatch.setattr(html_docs.MarkdownConverter, 'feed', lambda self, html: conversions.append(feed(self, html)))
+    assert [html_to_markdown(page) for page in pages] == [f'Page {index}' for index in range(8)]
+    assert conversions == []
+
+
+def test_renders_in_order_in_a_single_process():
+    assert parallel.render_in_order(str.upper, ['a', 'b', 'c']) == ['A', 'B', 'C']
@@ -0,0 +1,17 @@
+import pytest
+
+from shard import get_build_id, read_shard_fragments, write_shard_fragments
+
+
+def test_fragments_of_another_build_are_refused(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    build_id = get_build_id(1700000000, ['sqs', 's3'])
+    write_shard_fragments((1, 2), {'s3': {'sidebar': [], 'services': []}}, {}, build_id)
+    write_shard_fragments((2, 2), {'sqs': {'sidebar': [], 'services': []}}, {}, get_build_id(1700000001, ['sqs', 's3']))
+
+    with pytest.raises(ValueError, match='shard-2-of-2.json'):
+        read_shard_fragments(build_id)
+
+    write_shard_fragments((2, 2), {'sqs': {'sidebar': [], 'services': []}}, {}, get_build_id(1700000000, ['s3', 'sqs']))
+    fragments, failures = read_shard_fragments(build_id)
+    assert sorted(fragments) == ['s3', 'sqs'] and failures == []
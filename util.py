@@ -1,7 +1,12 @@
 import os
+from hashlib import blake2b
 from os import truncate, makedirs
+from weakref import WeakKeyDictionary
 
 import pythonic
+from html_docs import html_to_markdown, quote_markdown
+from parallel import record_cache_entry, register_cache
+from shared_shapes import get_shared_anchor, shared_shapes_path
 
 
 def create_new_file(path):
@@ -43,7 +48,13 @@ def get_shape_string_link(shape, shapes_path):
         return ''
     if shape.type_name in primitive_map:
         return primitive_map[shape.type_name]
-    return f'[{shape.name}]({shapes_path}#' + shape.name + ')' if shape else ''
+    return f'[{shape.name}]({get_shape_href(shape.name, shapes_path)})' if shape else ''
+
+
+def get_shape_href(shape_name, shapes_path):
+    # shapes that other services define the same way are documented once, on the shared data types page
+    anchor = get_shared_anchor(shapes_path, shape_name)
+    return f'{shared_shapes_path}#{anchor}' if anchor else f'{shapes_path}#{shape_name}'
 
 
 primitive_map = {
@@ -59,9 +70,47 @@ primitive_map = {
 }
 
 
-def get_enum_message(param_value):
+# keyed by the shape resolver, which every shape of a service shares and which goes away with its model
+_enum_index_cache = WeakKeyDictionary()
+
+
+def get_enum_key(values):
+    return blake2b('\0'.join(values).encode(), digest_size=16).digest()
+
+
+def build_enum_index(shapes):
+    # enums with the same values, in the same order, are rendered once under the first of their names
+    names_per_key = {}
+    for shape in sorted(shapes, key=lambda x: x.name):
+        if getattr(shape, 'enum', None):
+            names_per_key.setdefault(get_enum_key(shape.enum), []).append(shape.name)
+    return {name: names[0] for names in names_per_key.values() for name in names}
+
+
+def get_enum_index(shape):
+    resolver = shape._shape_resolver
+    if resolver not in _enum_index_cache:
+        _enum_index_cache[resolver] = build_enum_index(resolver.get_shape_by_name(name) for name in resolver._shape_map)
+        record_cache_entry('enum_index', resolver, None, _enum_index_cache[resolver])
+    return _enum_index_cache[resolver]
+
+
+def merge_enum_index(resolver, _, enum_index):
+    _enum_index_cache.setdefault(resolver, enum_index)
+
+
+register_cache('enum_index', merge_enum_index)
+
+
+def get_enums_path(shapes_path):
+    return f'{shapes_path[: shapes_path.rindex("/")]}/enums.md'
+
+
+def get_enum_message(param_value, shapes_path):
     if hasattr(param_value, 'enum') and param_value.enum:
-        return f'\n_This is an enum, accepting values: `{"`, `".join(param_value.enum)}`_\n\n'
+        enum_name = get_enum_index(param_value).get(param_value.name, param_value.name)
+        enum_link = f'[{param_value.name}]({get_enums_path(shapes_path)}#{enum_name})'
+        return f'\n_This is an enum, accepting one of the {len(param_value.enum)} values of {enum_link}_\n\n'
     return ''
 
 
@@ -74,9 +123,9 @@ def get_doc_str_members(shape, shapes_path, members):
     if not shape or not hasattr(shape, 'members') or not shape.members.items():
         return docstr
     for param_key, param_value in sorted(members.items(), reverse=True):
-        doc = param_value.documentation
+        doc = quote_markdown(html_to_markdown(param_value.documentation))
         required_str = 'required type ' if param_key in shape.required_members else 'type '
-        enum = get_enum_message(param_value)
+        enum = get_enum_message(param_value, shapes_path)
         shape_link = get_shape_string_link(param_value, shapes_path)
         docstr = f"""**{param_key}** ({required_str}{shape_link}): \n> {doc}\n\n{enum}<br/>{docstr}"""
     return docstr
@@ -86,7 +135,7 @@ def get_returns_string(output_shape, shapes_path):
     string_link = get_shape_string_link(output_shape, shapes_path)
     return f"""## Returns
 {f'_This return value is specified in greater detail in {string_link}._' if string_link else 'None'}
-{output_shape.documentation + '' if output_shape else ''}
+{html_to_markdown(output_shape.documentation) if output_shape else ''}
 {'It has:' if output_shape else ''}
 
 {get_doc_str(output_shape, shapes_path)}
@@ -109,7 +158,7 @@ def get_operation_documentation(operation_model, service_model):
     operation_name = operation_model.name
     service_name = service_model.service_name
     return (
-        operation_model.documentation
+        html_to_markdown(operation_model.documentation)
         + f'\n\n>See also: [AWS API Documentation for {service_name}.{operation_name}](https://docs.aws.amazon.com/goto/WebAPI/{service_name}-{service_model.api_version}/{operation_name})'
         + '\n'
     )
@@ -120,19 +169,6 @@ def get_accepts_redirect_link(client_name, fn_name, service_path):
 """
 
 
-def get_resource_path_for(resource_name, resource_path):
-    is_sub_res = is_sub_resource(resource_path)
-    if is_sub_res:
-        new_resource_path = f'{resource_path[:resource_path.rindex("/")]}/{resource_name}'
-    else:
-        new_resource_path = f'{resource_path}/sub-resources/{resource_name}'
-    return new_resource_path
-
-
-def is_sub_resource(resource_path):
-    return 'sub-resources' in resource_path
-
-
 def get_variable_name_for(name):
     variable_name = pythonic.xform_name(name)
     if '_' in variable_name:
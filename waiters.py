@@ -1,9 +1,24 @@
-from boto3.resources.model import Action, Waiter
-from botocore.waiter import WaiterModel
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 import pythonic
 from util import create_new_file, get_botostubs_message, get_link_to_client_function, write_lines, get_variable_name_for
 
+if TYPE_CHECKING:
+    from boto3.resources.model import ResourceModel, Waiter
+
+
+def get_waiters(client):
+    from botocore.waiter import WaiterModel
+
+    # parsed once per service and shared by the client and sub-resource waiter pages
+    waiter_config = client._get_waiter_config()
+    if 'waiters' not in waiter_config:
+        return {}
+    waiter_model = WaiterModel(waiter_config)
+    return {name: waiter_model.get_waiter(name) for name in waiter_model.waiter_names}
+
 
 def create_waiter_index(path, client_name, service_name, waiter_name):
     create_new_file(path)
@@ -22,14 +37,14 @@ waiter = client.get_waiter('{pythonic.xform_name(waiter_name)}')  # type: botost
     ]
 
 
-def get_example_waiter_snippet(name, pythonic_name, client_name, service, fn_name, service_path):
+def get_example_waiter_snippet(name, pythonic_name, client_name, service, fn_name, service_path, waiter):
     return f"""```python
 import boto3
 
 client = boto3.client('{client_name}')
 waiter = client.get_waiter('{pythonic_name}')  # type: botostubs.{service}.{name}Waiter
 waiter.wait(
-    WaiterConfig={{'Delay': 123, 'MaxAttempts': 123}}, OtherParams=...    
+    WaiterConfig={{'Delay': {waiter.delay}, 'MaxAttempts': {waiter.max_attempts}}}, OtherParams=...    
 )
 ```
 {get_botostubs_message()}
@@ -42,61 +57,91 @@ None
 """
 
 
-def get_waiter_page(name, fn_name, client_name, class_name, waiter_path, service_path):
+def get_max_wait_seconds(waiter):
+    # the waiter sleeps between attempts but not after the last one
+    return waiter.delay * (waiter.max_attempts - 1)
+
+
+def get_duration_string(seconds):
+    if seconds < 60:
+        return f'{seconds} seconds'
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f'{minutes} minutes' + (f' {seconds} seconds' if seconds else '')
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours} hours' + (f' {minutes} minutes' if minutes else '')
+
+
+def get_acceptor_value(value):
+    return '' if value is None else f'`{value}`'.replace('|', '\\|')
+
+
+def get_acceptors_string(waiter):
+    lines = [
+        '### Acceptors',
+        'After every check, the first acceptor that matches the response decides what happens next:\n',
+        '| State | Matcher | Argument | Expected |',
+        '| --- | --- | --- | --- |',
+    ]
+    for acceptor in waiter.acceptors:
+        argument, expected = get_acceptor_value(acceptor.argument), get_acceptor_value(acceptor.expected)
+        lines.append(f'| {acceptor.state} | {acceptor.matcher} | {argument} | {expected} |')
+    return '\n'.join(lines)
+
+
+def get_waiter_page(name, fn_name, client_name, class_name, waiter_path, service_path, waiter):
     pythonic_name = pythonic.xform_name(name)
     headline = f'# {pythonic_name} waiter'
     signature = f"""
 
-{get_example_waiter_snippet(name, pythonic_name, client_name, class_name, fn_name, service_path)}
+{get_example_waiter_snippet(name, pythonic_name, client_name, class_name, fn_name, service_path, waiter)}
+{get_acceptors_string(waiter)}
 """
-    documentation = f'Polls {client_name}_client.{get_link_to_client_function(fn_name, service_path)} every 15 seconds until a successful state is reached. An error is returned after 40 failed checks.'
+    max_wait = get_duration_string(get_max_wait_seconds(waiter))
+    documentation = f'Polls {client_name}_client.{get_link_to_client_function(fn_name, service_path)} every {waiter.delay} seconds until a successful state is reached. An error is returned after {waiter.max_attempts} failed checks, so it waits for at most {max_wait}.'
     list_item = f'- [{pythonic_name}]({waiter_path})'
     return list_item, signature, documentation, headline
 
 
-def handle_waiters(client, client_name, class_name, service_name, service_path, sidebar_lines):
-    waiter_config = client._get_waiter_config()
-    waiter_model = WaiterModel(waiter_config) if 'waiters' in waiter_config else None
-
-    if not waiter_model:
+def handle_waiters(waiters, client_name, class_name, service_name, service_path, sidebar_lines):
+    if not waiters:
         return
 
     waiters_path = f'{service_path}/waiters'
     sidebar_lines.append(f'          - [Waiters]({waiters_path})')
     docs_waiters_path = f'docs/{waiters_path}.md'
-    waiter_names = waiter_model.waiter_names
+    waiter_names = list(waiters)
     example_waiter_name = waiter_names[0]
     waiter_list_items = create_waiter_index(docs_waiters_path, client_name, service_name, example_waiter_name)
 
     for name in waiter_names:
-        handle_waiter(class_name, client_name, name, service_path, waiter_list_items, waiter_model, waiters_path)
+        handle_waiter(class_name, client_name, name, service_path, waiter_list_items, waiters[name], waiters_path)
 
     write_lines(docs_waiters_path, waiter_list_items)
 
 
-def handle_waiter(class_name, client_name, name, service_path, waiter_list_items, waiter_model, waiters_path):
-    waiter = waiter_model.get_waiter(name)
+def handle_waiter(class_name, client_name, name, service_path, waiter_list_items, waiter, waiters_path):
     pythonic_name = pythonic.xform_name(waiter.operation)
     waiter_path = f'{waiters_path}/{pythonic.xform_name(name)}'
     docs_waiter_path = f'docs/{waiter_path}.md'
     create_new_file(docs_waiter_path)
     list_item, signature, documentation, headline = get_waiter_page(
-        name, pythonic_name, client_name, class_name, waiter_path, service_path
+        name, pythonic_name, client_name, class_name, waiter_path, service_path, waiter
     )
     create_new_file(docs_waiter_path)
     write_lines(docs_waiter_path, [headline, documentation, signature])
     waiter_list_items.append(list_item)
 
 
-def handle_sub_resource_waiters(resource: Action, resource_list_items, service_path):
-    waiters = resource.resource.model.waiters
-    if waiters:
+def handle_sub_resource_waiters(resource_model: ResourceModel, resource_list_items, service_path, waiters):
+    resource_waiters = resource_model.waiters
+    if resource_waiters:
         resource_list_items.extend(['# Waiters', 'The following waiters are available:'])
     waiters_path = f'{service_path}/waiters'
     waiter: Waiter
-    for waiter in waiters:
+    for waiter in resource_waiters:
         name = pythonic.xform_name(waiter.waiter_name)
-        variable_name = get_variable_name_for(resource.name)
+        variable_name = get_variable_name_for(resource_model.name)
         resource_list_items.append(f'## {waiter.name}')
         resource_list_items.append(
             f"""```python
@@ -104,6 +149,10 @@ def handle_sub_resource_waiters(resource: Action, resource_list_items, service_p
 ```
 """
         )
+        client_waiter = waiters.get(waiter.waiter_name)
+        polling = ''
+        if client_waiter:
+            polling = f', polling every {client_waiter.delay} seconds up to {client_waiter.max_attempts} times'
         resource_list_items.append(
-            f'> Note that this waiter delegates to the client [{name}]({waiters_path}/{name}) waiter'
+            f'> Note that this waiter delegates to the client [{name}]({waiters_path}/{name}) waiter{polling}'
         )
@@ -0,0 +1,103 @@
+import importlib
+import os
+import time
+
+# in dependency order so that every reloaded module picks up the reloaded version of what it imports
+generator_module_names = [
+    'parallel',
+    'pythonic',
+    'html_docs',
+    'shared_shapes',
+    'util',
+    'references',
+    'examples',
+    'clients',
+    'resource_collections',
+    'resource_graph',
+    'waiters',
+    'resources',
+    'paginators',
+    'enums',
+    'checkpoint',
+    'catalog',
+    'catalog_db',
+    'main',
+]
+phases_per_module = {
+    'references': ['client'],
+    'examples': ['client', 'resources'],
+    'clients': ['client'],
+    'paginators': ['paginators'],
+    'enums': ['enums'],
+    'waiters': ['waiters', 'resources'],
+    'resource_collections': ['resources'],
+    'resource_graph': ['client', 'resources'],
+    'resources': ['resources'],
+    'main': ['service'],
+    'catalog': [],
+    'catalog_db': [],
+    'checkpoint': [],
+}
+
+
+def get_mtimes(modules):
+    return {name: os.stat(module.__file__).st_mtime for name, module in modules.items()}
+
+
+def get_phases_to_regenerate(changed_module_names):
+    phases = set()
+    for name in changed_module_names:
+        if name not in phases_per_module:
+            return None  # shared helpers like util affect every page
+        phases.update(phases_per_module[name])
+    return phases
+
+
+def regenerate(main, services, phases=None):
+    sidebar_lines, services_lines = [], []
+    for service in services:
+        for phase, fn in main.get_service_phases(service):
+            if phases is None or phase in phases:
+                fn(sidebar_lines, services_lines)
+    return sidebar_lines, services_lines
+
+
+def watch(client_names, timestamp=None, interval=1.0):
+    modules = {name: importlib.import_module(name) for name in generator_module_names}
+    main = modules['main']
+    # the models are loaded once; only the generator code is reloaded afterwards
+    services = [main.load_service(client_name) for client_name in client_names]
+    sidebar_lines, services_lines = regenerate(main, services)
+    main.write_lines(main.sidebar_path, main.create_sidebar() + sidebar_lines)
+    main.write_lines(main.services_path, main.create_services_page() + services_lines)
+    main.create_readme(timestamp)
+
+    docsify = main.start_docsify()
+    mtimes = get_mtimes(modules)
+    try:
+        while docsify.poll() is None:
+            time.sleep(interval)
+            new_mtimes = get_mtimes(modules)
+            changed_module_names = [name for name in generator_module_names if new_mtimes[name] != mtimes[name]]
+            mtimes = new_mtimes
+            if not changed_module_names:
+                continue
+            print('reloading', ', '.join(changed_module_names))
+            try:
+                for name in generator_module_names:
+                    modules[name] = importlib.reload(modules[name])
+                main = modules['main']
+                if 'resource_graph' in changed_module_names:
+                    # built once per service by load_service, so rebuilt with the reloaded module
+                    for service in services:
+                        resource, service_path = service['resource'], service['service_path']
+                        service['resource_graph'] = main.get_resource_graph(resource, service_path)
+                phases = get_phases_to_regenerate(changed_module_names)
+                regenerate(main, services, phases)
+                print('regenerated', 'all pages' if phases is None else ', '.join(sorted(phases)) or 'nothing')
+            except Exception as e:
+                # keep serving; the next save will be picked up
+                print('failed to regenerate pages:', repr(e))
+    except KeyboardInterrupt:
+        docsify.terminate()
+    return docsify.wait()